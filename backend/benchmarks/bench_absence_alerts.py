@@ -0,0 +1,123 @@
+# Alertas de infrequência: GET /api/attendance/alerts lendo o estado mantido
+# a cada gravação comparado a calcular os mesmos alertas percorrendo todo o
+# histórico do ano a cada requisição; custo do estado na chamada em lote e
+# tempo do recálculo completo, conferido contra o estado incremental.
+#
+#   python -m benchmarks.bench_absence_alerts --classes 20 --students 30 --days 150
+import argparse
+import random
+import statistics
+from datetime import timedelta
+
+import src.routes.attendance as attendance_routes
+from benchmarks.common import QueryCounter, create_bench_app, login, percentile, seed_district, timed
+from src.models.absence_state import (
+    ABSENCE_ALERT_STREAK, ABSENCE_ALERT_TERM_MIN_DAYS, ABSENCE_ALERT_TERM_RATE, compute_states, rebuild_absence_states, verify_absence_states
+)
+from src.models.user import db
+from src.partitions import current_school_year
+
+
+def full_scan_alerts(window_absences):
+    # O que o endpoint faria sem o estado: reler todas as frequências
+    alerts = []
+    for student_id, state in compute_states():
+        total = state['term_present'] + state['term_absent'] + state['term_late']
+        if (state['streak'] >= ABSENCE_ALERT_STREAK
+                or state['window_absent'] >= window_absences
+                or (total >= ABSENCE_ALERT_TERM_MIN_DAYS and state['term_absent'] >= total * ABSENCE_ALERT_TERM_RATE)):
+            alerts.append(student_id)
+    return alerts
+
+
+def roll_calls(client, class_ids, rosters, days, rounds):
+    # Chamadas em lote de dias novos, com faltas suficientes para mover sequências
+    for day in days[:rounds]:
+        for class_id in class_ids:
+            response = client.post('/api/attendance/batch', json={
+                'class_id': class_id,
+                'date': day.isoformat(),
+                'records': [
+                    {'student_id': student_id, 'status': random.choice(('present', 'present', 'absent', 'late'))}
+                    for student_id in rosters[class_id]
+                ]
+            })
+            assert response.status_code == 200 and response.get_json()['errors'] == 0, response.get_json()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--classes', type=int, default=20)
+    parser.add_argument('--students', type=int, default=30)
+    parser.add_argument('--days', type=int, default=150, help='dias letivos de histórico no ano corrente')
+    parser.add_argument('--rounds', type=int, default=30)
+    parser.add_argument('--window-absences', type=int, default=3,
+                        help='limite de faltas em 30 dias; o histórico sintético tem 1 falta a cada 8 dias')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    app = create_bench_app()
+    elapsed, (class_ids, rosters, days) = timed(
+        seed_district, app, 1, args.classes, args.students, 1, args.days, current_school_year()
+    )
+    rows = len(days) * args.classes * args.students
+    print(f'{rows} frequências criadas em {elapsed:.1f}s')
+    client = login(app)
+    with app.app_context():
+        engine = db.engine
+
+    # Leitura dos alertas: estado pré-calculado x varredura do histórico
+    state_samples, scan_samples = [], []
+    for _ in range(args.rounds):
+        elapsed, response = timed(client.get, f'/api/attendance/alerts?window_absences={args.window_absences}')
+        assert response.status_code == 200, response.get_json()
+        state_samples.append(elapsed * 1000)
+    alerts = len(response.get_json()['alerts'])
+    with app.app_context():
+        for _ in range(max(3, args.rounds // 10)):
+            elapsed, scanned = timed(full_scan_alerts, args.window_absences)
+            scan_samples.append(elapsed * 1000)
+    assert len(scanned) == alerts, (len(scanned), alerts)
+    print(f'\n{alerts} alertas')
+    print(f'{"estado mantido":>16}: p50 {statistics.median(state_samples):8.2f} ms  p95 {percentile(state_samples, 0.95):8.2f} ms')
+    print(f'{"varredura":>16}: p50 {statistics.median(scan_samples):8.2f} ms  p95 {percentile(scan_samples, 0.95):8.2f} ms')
+
+    # Chamada em lote com e sem a atualização do estado, em dias novos
+    new_days = []
+    day = days[-1]
+    while len(new_days) < 2 * args.rounds:
+        day += timedelta(days=1)
+        if day.weekday() < 5:
+            new_days.append(day)
+    class_ids = class_ids[:1]
+    results = {}
+    update = attendance_routes.update_absence_states
+    for name, function, chunk in (
+        ('sem estado', lambda changes: None, new_days[:args.rounds]),
+        ('com estado', update, new_days[args.rounds:])
+    ):
+        attendance_routes.update_absence_states = function
+        with QueryCounter(engine) as counter:
+            elapsed, _ = timed(roll_calls, client, class_ids, rosters, chunk, args.rounds)
+        results[name] = (elapsed / args.rounds * 1000, counter.count / args.rounds)
+    attendance_routes.update_absence_states = update
+    print(f'\nchamada em lote ({args.students} alunos)')
+    for name, (latency, queries) in results.items():
+        print(f'{name:>16}: {latency:8.2f} ms/chamada  {queries:5.1f} comandos SQL/chamada')
+
+    # Os dias 'sem estado' deixaram estados desatualizados: recalcula, aplica
+    # mais chamadas e confere o incremental contra o recálculo
+    with app.app_context():
+        elapsed, rebuilt = timed(rebuild_absence_states)
+        print(f'\nrecálculo completo: {rebuilt} estudantes em {elapsed * 1000:.0f} ms')
+    more_days = [new_days[-1] + timedelta(days=offset) for offset in range(1, 8)]
+    roll_calls(client, class_ids, rosters, more_days, len(more_days))
+    with app.app_context():
+        elapsed, differences = timed(verify_absence_states)
+    print(f'conferência: {len(differences)} divergências em {elapsed * 1000:.0f} ms')
+    assert not differences, differences[:3]
+
+
+if __name__ == '__main__':
+    main()
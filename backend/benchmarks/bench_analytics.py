@@ -0,0 +1,75 @@
+# Analytics em colunas (numpy) comparadas aos mesmos agregados calculados em
+# laços Python puro, sobre as mesmas frequências: carga das colunas, mapa de
+# calor, padrão semanal e coortes, conferindo que os resultados são idênticos,
+# e o tempo de cada endpoint /api/analytics/*.
+#
+#   python -m benchmarks.bench_analytics --rows 5000000 --classes 100 --students 40
+import argparse
+import gc
+
+from benchmarks.common import create_bench_app, fill_attendances, login, seed_classes, timed
+from src import analytics
+from src.models.class_model import Class
+from src.models.user import db
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000000)
+    parser.add_argument('--classes', type=int, default=100)
+    parser.add_argument('--students', type=int, default=40)
+    args = parser.parse_args()
+    if analytics.np is None:
+        raise SystemExit('numpy não está instalado: pip install numpy')
+
+    app = create_bench_app()
+    class_ids = seed_classes(app, args.classes, args.students)
+    with app.app_context():
+        # Séries diferentes para a comparação entre coortes
+        for index, cls in enumerate(Class.query.order_by(Class.id)):
+            cls.grade = f'{index % 9 + 1}º Ano'
+        db.session.commit()
+        db_path = db.engine.url.database
+    elapsed, days = timed(fill_attendances, db_path, args.rows, args.classes, args.students)
+    print(f'{args.rows} frequências ({days} dias, {len(class_ids)} turmas) criadas em {elapsed:.1f}s')
+
+    with app.app_context():
+        classes = Class.query.all()
+        names = sorted({cls.grade for cls in classes})
+        class_cohorts = {cls.id: names.index(cls.grade) for cls in classes}
+
+        elapsed_numpy, vectorized = timed(analytics.load_columns)
+        gc.collect()
+        elapsed_python, plain = timed(analytics.load_columns, vectorized=False)
+        print(f'\n{"carga das colunas":>18}: numpy {elapsed_numpy:7.2f} s   python {elapsed_python:7.2f} s   '
+              f'({len(vectorized)} linhas)')
+        del plain
+        gc.collect()
+        # Os laços Python recebem listas, sem o custo de iterar arrays do numpy
+        plain = vectorized.tolist()
+
+        for name, function, extra in (
+            ('mapa de calor', analytics.heatmap, ()),
+            ('dias da semana', analytics.weekdays, ()),
+            ('coortes', analytics.cohorts, (class_cohorts, names))
+        ):
+            elapsed_numpy, expected = timed(function, vectorized, *extra)
+            elapsed_python, result = timed(function, plain, *extra)
+            assert result == expected, name
+            print(f'{name:>18}: numpy {elapsed_numpy:7.2f} s   python {elapsed_python:7.2f} s   '
+                  f'{elapsed_python / elapsed_numpy:6.1f}x')
+        del plain, vectorized
+        gc.collect()
+
+    client = login(app)
+    # Todo o histórico gerado (a partir de 2015-02-01) em cada endpoint
+    period = 'from=2015-01-01&to=2099-12-31'
+    print()
+    for path in ('heatmap', 'weekdays', 'cohorts'):
+        elapsed, response = timed(client.get, f'/api/analytics/{path}?{period}')
+        assert response.status_code == 200, response.get_json()
+        print(f'{"/api/analytics/" + path:>26}: {elapsed:7.2f} s  {len(response.data) / 1024:8.0f} KiB')
+
+
+if __name__ == '__main__':
+    main()
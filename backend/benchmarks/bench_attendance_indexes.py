@@ -0,0 +1,63 @@
+# Latência das consultas de frequência antes e depois dos índices compostos,
+# partindo de um app.db antigo (sem índices) migrado por upgrade_database().
+#
+#   python -m benchmarks.bench_attendance_indexes --rows 10000000
+import argparse
+import random
+from datetime import date
+
+from benchmarks.common import create_bench_app, fill_attendances, seed_classes, timed
+from src.migrations import upgrade_database
+from src.models.attendance import Attendance
+from src.models.user import db
+
+
+def measure(samples):
+    by_class = by_student = 0.0
+    for class_id, student_id, day in samples:
+        elapsed, _ = timed(lambda: Attendance.query.filter_by(class_id=class_id, date=day).all())
+        by_class += elapsed
+        elapsed, _ = timed(lambda: Attendance.query.filter_by(student_id=student_id, date=day).first())
+        by_student += elapsed
+    db.session.remove()
+    return by_class / len(samples) * 1000, by_student / len(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--classes', type=int, default=250)
+    parser.add_argument('--students-per-class', type=int, default=40)
+    parser.add_argument('--samples', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    seed_classes(app, args.classes, args.students_per_class)
+    with app.app_context():
+        # Simula um app.db criado antes dos índices
+        for index in Attendance.__table__.indexes:
+            index.drop(db.engine)
+        db_path = db.engine.url.database
+
+    days = fill_attendances(db_path, args.rows, args.classes, args.students_per_class)
+    random.seed(1)
+    samples = [
+        (random.randint(1, args.classes),
+         random.randint(1, args.classes * args.students_per_class),
+         date.fromordinal(date(2015, 2, 1).toordinal() + random.randrange(days)))
+        for _ in range(args.samples)
+    ]
+
+    with app.app_context():
+        before = measure(samples)
+        migration, _ = timed(upgrade_database)
+        after = measure(samples)
+
+    print(f'{args.rows} registros de frequência, migração em {migration:.1f} s')
+    print(f'{"consulta":<28}{"sem índice":>14}{"com índice":>14}')
+    print(f'{"turma + data":<28}{before[0]:>11.2f} ms{after[0]:>11.2f} ms')
+    print(f'{"estudante + data":<28}{before[1]:>11.2f} ms{after[1]:>11.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
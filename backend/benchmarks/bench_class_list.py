@@ -0,0 +1,34 @@
+# Número de comandos SQL e latência do GET /api/classes conforme o número de
+# turmas cresce; a quantidade de comandos deve permanecer constante.
+#
+#   python -m benchmarks.bench_class_list --sizes 10 100 1000
+import argparse
+
+from benchmarks.common import QueryCounter, create_bench_app, login, seed_classes, timed
+from src.models.user import db
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--students-per-class', type=int, default=30)
+    args = parser.parse_args()
+
+    statements = set()
+    for size in args.sizes:
+        app = create_bench_app()
+        seed_classes(app, size, args.students_per_class)
+        client = login(app)
+        with app.app_context():
+            engine = db.engine
+        with QueryCounter(engine) as counter:
+            elapsed, response = timed(client.get, '/api/classes')
+        assert response.status_code == 200 and len(response.get_json()) == size
+        statements.add(counter.count)
+        print(f'{size:>6} turmas: {counter.count} comandos SQL, {elapsed * 1000:8.1f} ms')
+
+    assert len(statements) == 1, f'número de comandos varia com o número de turmas: {sorted(statements)}'
+
+
+if __name__ == '__main__':
+    main()
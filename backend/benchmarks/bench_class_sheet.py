@@ -0,0 +1,59 @@
+# Latência do GET /api/classes/<id>/sheet em uma turma de 500 estudantes com
+# metade da chamada registrada, comparada com o fluxo antigo do frontend
+# (todos os estudantes + frequências do dia, cruzados no cliente). Falha se o
+# p95 da folha passar da meta.
+#
+#   python -m benchmarks.bench_class_sheet --students 500
+import argparse
+import statistics
+
+from benchmarks.common import create_bench_app, login, percentile, seed_classes, timed
+from src.models.student import Student
+
+# Meta de latência da folha de chamada (p95, servidor local)
+SHEET_P95_TARGET_MS = 50
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--classes', type=int, default=20)
+    parser.add_argument('--students', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=100)
+    args = parser.parse_args()
+
+    app = create_bench_app(PAGINATION_MAX_LIMIT=args.classes * args.students)
+    class_ids = seed_classes(app, args.classes, args.students)
+    class_id = class_ids[0]
+    client = login(app)
+    with app.app_context():
+        roster = [row.id for row in Student.query.with_entities(Student.id).filter_by(class_id=class_id)]
+    client.post('/api/attendance/batch', json={
+        'class_id': class_id,
+        'date': '2024-03-01',
+        'records': [{'student_id': student_id, 'status': 'present'} for student_id in roster[::2]]
+    })
+
+    def sheet():
+        response = client.get(f'/api/classes/{class_id}/sheet?date=2024-03-01')
+        assert len(response.get_json()['students']) == args.students
+        return len(response.data)
+
+    def old_flow():
+        students = client.get(f'/api/students?limit={args.classes * args.students}')
+        attendances = client.get(f'/api/attendance?class_id={class_id}&date=2024-03-01')
+        return len(students.data) + len(attendances.data)
+
+    for name, fn in (('folha (LEFT JOIN)', sheet), ('estudantes + frequências', old_flow)):
+        samples = []
+        for _ in range(args.requests):
+            elapsed, size = timed(fn)
+            samples.append(elapsed * 1000)
+        print(f'{name:>26}: p50 {statistics.median(samples):6.1f} ms  p95 {percentile(samples, 0.95):6.1f} ms  {size:>9} bytes')
+        if fn is sheet:
+            sheet_p95 = percentile(samples, 0.95)
+
+    assert sheet_p95 <= SHEET_P95_TARGET_MS, f'p95 da folha {sheet_p95:.1f} ms acima da meta de {SHEET_P95_TARGET_MS} ms'
+
+
+if __name__ == '__main__':
+    main()
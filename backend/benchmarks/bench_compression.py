@@ -0,0 +1,78 @@
+# Troca entre CPU e bytes da compressão das respostas da API: para as
+# listagens de estudantes e frequências, mede tamanho, tempo de CPU da
+# compressão e latência ponta a ponta de cada codificação/nível disponível,
+# e estima o tempo de transferência em uma rede escolar lenta.
+#
+#   python -m benchmarks.bench_compression --students 5000 --attendances 5000
+import argparse
+import statistics
+import time
+
+from benchmarks.common import create_bench_app, fill_attendances, login, seed_classes, timed
+from src.models.user import db
+from src.compression import available_encodings, compress
+
+LEVELS = {'gzip': (1, 6, 9), 'br': (1, 4, 11), 'zstd': (1, 3, 10)}
+
+
+def cpu_time(data, encoding, level, rounds):
+    start = time.process_time()
+    for _ in range(rounds):
+        compressed = compress(data, encoding, level)
+    return (time.process_time() - start) / rounds, len(compressed)
+
+
+def db_path(app):
+    with app.app_context():
+        return db.engine.url.database
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--attendances', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--link-mbps', type=float, default=2.0, help='banda da rede da escola')
+    args = parser.parse_args()
+
+    classes = max(1, args.students // 40)
+    app = create_bench_app(PAGINATION_MAX_LIMIT=max(args.students, args.attendances))
+    seed_classes(app, classes, args.students // classes)
+    with app.app_context():
+        fill_attendances(db.engine.url.database, args.attendances, classes, args.students // classes)
+    client = login(app)
+    endpoints = (
+        f'/api/students?limit={args.students}',
+        f'/api/attendance?limit={args.attendances}'
+    )
+    print(f'codificações disponíveis: {", ".join(available_encodings())}; rede de {args.link_mbps} Mbit/s\n')
+
+    for path in endpoints:
+        data = client.get(path, headers={'Accept-Encoding': 'identity'}).data
+        print(f'{path} ({len(data)} bytes sem compressão, {len(data) * 8 / args.link_mbps / 1e6:.2f}s na rede)')
+        print(f'{"codificação":>14} {"bytes":>10} {"razão":>7} {"CPU":>9} {"ponta a ponta":>14} {"rede":>7}')
+        samples = [timed(client.get, path, headers={'Accept-Encoding': 'identity'})[0] for _ in range(args.rounds)]
+        print(f'{"identity":>14} {len(data):10d} {1:7.1f} {0:7.1f}ms {statistics.median(samples) * 1000:12.1f}ms '
+              f'{len(data) * 8 / args.link_mbps / 1e6:6.2f}s')
+
+        for encoding in available_encodings():
+            for level in LEVELS[encoding]:
+                seconds, size = cpu_time(data, encoding, level, args.rounds)
+                configured = create_bench_app(
+                    db_path=db_path(app), seed=False,
+                    COMPRESSION_LEVELS={encoding: level},
+                    PAGINATION_MAX_LIMIT=max(args.students, args.attendances)
+                )
+                configured_client = login(configured)
+                samples = [
+                    timed(configured_client.get, path, headers={'Accept-Encoding': encoding})[0]
+                    for _ in range(args.rounds)
+                ]
+                print(f'{encoding + " " + str(level):>14} {size:10d} {len(data) / size:7.1f} {seconds * 1000:7.1f}ms '
+                      f'{statistics.median(samples) * 1000:12.1f}ms {size * 8 / args.link_mbps / 1e6:6.2f}s')
+        print()
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# Vazão de chamadas simultâneas (POST /api/attendance/batch, uma turma por
+# thread, com leitores consultando frequências em paralelo) com a
+# configuração padrão do SQLite e com WAL + busy_timeout + pragmas.
+#
+#   python -m benchmarks.bench_concurrent_writes --threads 16 --days 20
+import argparse
+import threading
+
+from benchmarks.common import create_bench_app, login, school_day, seed_classes, timed
+from src.models.student import Student
+
+
+def run(config, threads, days, students):
+    app = create_bench_app(**config)
+    class_ids = seed_classes(app, threads, students)
+    with app.app_context():
+        rosters = {
+            class_id: [row.id for row in Student.query.with_entities(Student.id).filter_by(class_id=class_id)]
+            for class_id in class_ids
+        }
+    outcome = {'ok': 0, 'failed': 0, 'reads': 0}
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def writer(class_id):
+        client = login(app)
+        for day in range(days):
+            response = client.post('/api/attendance/batch', json={
+                'class_id': class_id,
+                'date': school_day(day),
+                'records': [{'student_id': student_id, 'status': 'present'} for student_id in rosters[class_id]]
+            })
+            with lock:
+                outcome['ok' if response.status_code == 200 else 'failed'] += 1
+
+    def reader():
+        client = login(app)
+        while not done.is_set():
+            client.get(f'/api/attendance?class_id={class_ids[0]}&limit=100')
+            with lock:
+                outcome['reads'] += 1
+
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    writers = [threading.Thread(target=writer, args=(class_id,)) for class_id in class_ids]
+    for thread in readers:
+        thread.start()
+    elapsed, _ = timed(lambda: [thread.start() for thread in writers] and [thread.join() for thread in writers])
+    done.set()
+    for thread in readers:
+        thread.join()
+    return outcome['ok'] / elapsed, outcome['failed'], outcome['reads'] / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--days', type=int, default=20)
+    parser.add_argument('--students', type=int, default=40)
+    args = parser.parse_args()
+
+    scenarios = (
+        ('padrão do SQLite', {'SQLITE_PRAGMAS': {}, 'SQLALCHEMY_ENGINE_OPTIONS': {}}),
+        ('WAL + pragmas', {})
+    )
+    for name, config in scenarios:
+        writes, failed, reads = run(config, args.threads, args.days, args.students)
+        print(f'{name:>18}: {writes:7.1f} chamadas/s  {failed:4d} falhas  {reads:7.1f} leituras/s')
+
+
+if __name__ == '__main__':
+    main()
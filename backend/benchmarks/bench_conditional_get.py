@@ -0,0 +1,59 @@
+# Listagens repetidas com If-None-Match: a segunda requisição deve responder
+# 304 sem consultar nem serializar os registros. Falha se algum to_dict() for
+# chamado na revalidação.
+#
+#   python -m benchmarks.bench_conditional_get --students 5000
+import argparse
+
+from benchmarks.common import QueryCounter, create_bench_app, login, seed_classes, timed
+from src.models.class_model import Class
+from src.models.student import Student
+from src.models.user import db
+
+
+def counting_to_dict(model):
+    original = model.to_dict
+    calls = {'count': 0}
+
+    def to_dict(self):
+        calls['count'] += 1
+        return original(self)
+
+    model.to_dict = to_dict
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--classes', type=int, default=100)
+    parser.add_argument('--students', type=int, default=5000)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    seed_classes(app, args.classes, args.students // args.classes)
+    client = login(app)
+    with app.app_context():
+        engine = db.engine
+    calls = {Student: counting_to_dict(Student), Class: counting_to_dict(Class)}
+
+    etags = {}
+    for url, model in ((f'/api/students?limit={args.students}', Student), ('/api/classes', Class)):
+        with QueryCounter(engine) as full_queries:
+            full_time, full = timed(client.get, url)
+        serialized = calls[model]['count']
+        with QueryCounter(engine) as cached_queries:
+            cached_time, cached = timed(client.get, url, headers={'If-None-Match': full.headers['ETag']})
+        assert full.status_code == 200 and cached.status_code == 304
+        etags[model] = full.headers['ETag']
+        assert calls[model]['count'] == serialized, 'a revalidação serializou registros'
+        print(f'{url:<28} 200: {full_time * 1000:7.1f} ms {full_queries.count} SQL {len(full.data):>9} bytes  '
+              f'304: {cached_time * 1000:5.1f} ms {cached_queries.count} SQL {len(cached.data)} bytes')
+
+    # Alterar um estudante invalida as ETags de estudantes e de turmas
+    client.put('/api/students/1', json={'name': 'Aluno Renomeado'})
+    for url, model in ((f'/api/students?limit={args.students}', Student), ('/api/classes', Class)):
+        assert client.get(url, headers={'If-None-Match': etags[model]}).status_code == 200
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# Pico de memória (RSS) e vazão da exportação em streaming comparada com a
+# materialização completa da listagem antiga (todos os objetos + to_dict +
+# um único JSON). Cada modo roda em um processo separado para que o pico de
+# RSS de um não contamine o outro.
+#
+#   python -m benchmarks.bench_export --rows 1000000
+import argparse
+import json
+import resource
+import subprocess
+import sys
+
+from benchmarks.common import create_bench_app, fill_attendances, login, seed_classes, timed
+from src.models.attendance import Attendance
+from src.models.user import db
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(mode, db_path):
+    app = create_bench_app(db_path, seed=False)
+    client = login(app)
+    baseline = peak_rss_mb()
+
+    def export(export_format):
+        response = client.get(f'/api/attendance/export?format={export_format}', buffered=False)
+        size = sum(len(chunk) for chunk in response.response)
+        response.close()
+        return size
+
+    def materialize():
+        with app.app_context():
+            return len(json.dumps([attendance.to_dict() for attendance in Attendance.query.all()]))
+
+    if mode == 'materializado':
+        elapsed, size = timed(materialize)
+    else:
+        elapsed, size = timed(export, mode)
+    print(json.dumps({'elapsed': elapsed, 'bytes': size, 'rss': peak_rss_mb() - baseline}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--mode')
+    parser.add_argument('--db')
+    args = parser.parse_args()
+
+    if args.mode:
+        return run(args.mode, args.db)
+
+    app = create_bench_app()
+    seed_classes(app, 100, 40)
+    with app.app_context():
+        db_path = db.engine.url.database
+    fill_attendances(db_path, args.rows, 100, 40)
+
+    print(f'{args.rows} registros de frequência')
+    for mode in ('ndjson', 'csv', 'materializado'):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_export', '--mode', mode, '--db', db_path],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output)
+        print(f'{mode:>14}: {args.rows / result["elapsed"]:>10.0f} linhas/s  '
+              f'{result["bytes"] / 2**20:8.1f} MiB  pico de RSS +{result["rss"]:7.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
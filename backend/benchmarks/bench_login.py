@@ -0,0 +1,51 @@
+# Logins por segundo com cada política de hash de senha, com um cliente
+# (um worker ocupado) e com vários clientes simultâneos disputando o pool de
+# verificação.
+#
+#   python -m benchmarks.bench_login --methods pbkdf2:sha256:600000 pbkdf2:sha256:100000 scrypt
+import argparse
+import threading
+
+from benchmarks.common import create_bench_app, timed
+from src.models.user import User, db
+
+
+def run_logins(app, logins, clients):
+    def worker(count):
+        client = app.test_client()
+        for _ in range(count):
+            response = client.post('/api/auth/login', json={'username': 'professor', 'password': 'prof123'})
+            assert response.status_code == 200, response.get_json()
+
+    threads = [threading.Thread(target=worker, args=(logins // clients,)) for _ in range(clients)]
+    elapsed, _ = timed(lambda: [thread.start() for thread in threads] and [thread.join() for thread in threads])
+    return (logins // clients) * clients / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--methods', nargs='+', default=['pbkdf2:sha256:600000', 'pbkdf2:sha256:100000', 'scrypt'])
+    parser.add_argument('--logins', type=int, default=40)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--check-workers', type=int, default=4)
+    args = parser.parse_args()
+
+    for method in args.methods:
+        app = create_bench_app(
+            PASSWORD_HASH_METHOD=method,
+            PASSWORD_CHECK_WORKERS=args.check_workers,
+            PASSWORD_CHECK_QUEUE=args.clients
+        )
+        with app.app_context():
+            professor = User(username='professor', role='teacher')
+            professor.set_password('prof123')
+            db.session.add(professor)
+            db.session.commit()
+        single = run_logins(app, args.logins // 4, 1)
+        concurrent = run_logins(app, args.logins, args.clients)
+        print(f'{method:>24}: {single:7.1f} logins/s (1 cliente)  '
+              f'{concurrent:7.1f} logins/s ({args.clients} clientes, {args.check_workers} threads de verificação)')
+
+
+if __name__ == '__main__':
+    main()
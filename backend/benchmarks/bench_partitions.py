@@ -0,0 +1,85 @@
+# Latência das consultas do ano letivo corrente com 10 anos de histórico,
+# com todas as frequências na tabela principal e depois de arquivar os anos
+# encerrados (flask archive-year), além do tamanho do banco principal.
+#
+#   python -m benchmarks.bench_partitions --years 10 --classes 10 --students 40
+import argparse
+import os
+import statistics
+import tempfile
+
+from benchmarks.common import create_bench_app, login, percentile, seed_district, timed
+from src.models.user import db
+from src.partitions import archive_year, current_school_year
+
+# Dias do ano corrente usados nas consultas (o histórico começa em fevereiro)
+CURRENT_DAY = f'{current_school_year()}-03-10'
+
+
+def queries(class_id, year):
+    return (
+        ('chamada do dia', f'/api/attendance?class_id={class_id}&date={CURRENT_DAY}'),
+        ('turma no ano', f'/api/attendance?class_id={class_id}&from={year}-01-01&to={year}-12-31&limit=5000'),
+        ('rede no mês', f'/api/attendance?from={year}-03-01&to={year}-03-31&limit=5000'),
+        ('exportação da turma', f'/api/attendance/export?format=csv&class_id={class_id}&from={year}-01-01&to={year}-12-31'),
+        ('resumo da turma', f'/api/attendance/summary/classes?class_id={class_id}&from={year}-01-01&to={year}-12-31'),
+    )
+
+
+def fetch(client, path):
+    # Lê o corpo dentro da medição: a exportação é enviada em fluxo
+    response = client.get(path)
+    return response.status_code, len(response.data)
+
+
+def measure(client, class_id, rounds):
+    results = {}
+    for name, path in queries(class_id, current_school_year()):
+        samples = []
+        for _ in range(rounds):
+            elapsed, (status, size) = timed(fetch, client, path)
+            assert status == 200, path
+            samples.append(elapsed * 1000)
+        results[name] = (statistics.median(samples), percentile(samples, 0.95), size)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--classes', type=int, default=10)
+    parser.add_argument('--students', type=int, default=40)
+    parser.add_argument('--rounds', type=int, default=30)
+    args = parser.parse_args()
+
+    app = create_bench_app(ARCHIVE_DIR=tempfile.mkdtemp(prefix='archive-'), PAGINATION_MAX_LIMIT=5000)
+    elapsed, (class_ids, rosters, days) = timed(
+        seed_district, app, 1, args.classes, args.students, args.years, first_year=current_school_year()
+    )
+    print(f'{len(days) * args.classes * args.students} frequências de {args.years} anos criadas em {elapsed:.1f}s')
+    client = login(app)
+    with app.app_context():
+        db_path = db.engine.url.database
+
+    before = measure(client, class_ids[0], args.rounds)
+    size_before = os.path.getsize(db_path)
+
+    with app.app_context():
+        elapsed, archived = timed(lambda: sum(
+            archive_year(year) for year in range(current_school_year() - args.years + 1, current_school_year())
+        ))
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql('VACUUM')
+    print(f'{args.years - 1} anos ({archived} frequências) arquivados em {elapsed:.1f}s')
+    after = measure(client, class_ids[0], args.rounds)
+    size_after = os.path.getsize(db_path)
+
+    print(f'\n{"consulta do ano corrente":>24}  {"tudo na tabela":>22}  {"anos arquivados":>22}')
+    for name in before:
+        print(f'{name:>24}  p50 {before[name][0]:6.2f} p95 {before[name][1]:6.2f} ms  '
+              f'p50 {after[name][0]:6.2f} p95 {after[name][1]:6.2f} ms')
+    print(f'\nbanco principal: {size_before / 2 ** 20:.1f} MiB -> {size_after / 2 ** 20:.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
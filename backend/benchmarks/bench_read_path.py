@@ -0,0 +1,58 @@
+# Memória por linha e linhas/s ao ler N registros de frequência como objetos
+# ORM, como tuplas via Query.with_entities e como tuplas via select() do Core
+# executado direto na conexão (caminho usado pelas listagens).
+#
+#   python -m benchmarks.bench_read_path --rows 100000
+import argparse
+import gc
+import tracemalloc
+
+from sqlalchemy import select
+
+from benchmarks.common import create_bench_app, fill_attendances, seed_classes, timed
+from src.models.attendance import Attendance
+from src.models.user import db
+
+
+def orm_entities():
+    return Attendance.query.all()
+
+
+def orm_tuples():
+    return db.session.query(*[getattr(Attendance, name) for name in Attendance.__table__.columns.keys()]).all()
+
+
+def core_tuples():
+    return db.session.connection().execute(select(*Attendance.__table__.columns)).all()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    seed_classes(app, 50, 40)
+    with app.app_context():
+        fill_attendances(db.engine.url.database, args.rows, 50, 40)
+
+    print(f'{args.rows} registros de frequência')
+    for name, fn in (('objetos ORM', orm_entities), ('tuplas via ORM', orm_tuples), ('tuplas via Core', core_tuples)):
+        with app.app_context():
+            fn()
+            db.session.remove()
+            elapsed, _ = timed(fn)
+            db.session.remove()
+
+            gc.collect()
+            tracemalloc.start()
+            rows = fn()
+            retained, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del rows
+            db.session.remove()
+        print(f'{name:>16}: {args.rows / elapsed:>10.0f} linhas/s  {retained / args.rows:7.0f} bytes/linha')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# Compara a chamada de uma turma inteira pelo POST /api/attendance (um aluno
+# por requisição) com o POST /api/attendance/batch (turma inteira de uma vez).
+#
+#   python -m benchmarks.bench_roll_call --students 40 --rounds 5
+import argparse
+
+from benchmarks.common import QueryCounter, create_bench_app, login, school_day, seed_classes, timed
+from src.models.student import Student
+from src.models.user import db
+
+
+def per_row(client, class_id, student_ids, day):
+    for student_id in student_ids:
+        response = client.post('/api/attendance', json={
+            'student_id': student_id, 'class_id': class_id, 'date': day, 'status': 'present'
+        })
+        assert response.status_code == 201, response.get_json()
+
+
+def batch(client, class_id, student_ids, day):
+    response = client.post('/api/attendance/batch', json={
+        'class_id': class_id,
+        'date': day,
+        'records': [{'student_id': student_id, 'status': 'present'} for student_id in student_ids]
+    })
+    assert response.status_code == 200 and response.get_json()['errors'] == 0, response.get_json()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--students', type=int, default=40)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    class_id = seed_classes(app, 1, args.students)[0]
+    client = login(app)
+    with app.app_context():
+        student_ids = [row.id for row in Student.query.with_entities(Student.id).filter_by(class_id=class_id)]
+        engine = db.engine
+
+    for name, fn, offset in (('por aluno', per_row, 0), ('em lote', batch, 1000)):
+        total = 0.0
+        with QueryCounter(engine) as counter:
+            for i in range(args.rounds):
+                elapsed, _ = timed(fn, client, class_id, student_ids, school_day(offset + i))
+                total += elapsed
+        print(f'{name:>10}: {total / args.rounds * 1000:8.1f} ms/chamada  '
+              f'{counter.count / args.rounds:6.0f} comandos SQL/chamada  '
+              f'({args.students} alunos, {args.rounds} rodadas)')
+
+
+if __name__ == '__main__':
+    main()
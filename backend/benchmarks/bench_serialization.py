@@ -0,0 +1,57 @@
+# Serialização de N registros de frequência: objetos ORM + to_dict() + json
+# (caminho antigo) contra tuplas de colunas + row_encoder + dumps, com o
+# json da biblioteca padrão e com orjson (quando instalado).
+#
+#   python -m benchmarks.bench_serialization --rows 100000
+import argparse
+import json
+
+from benchmarks.common import create_bench_app, fill_attendances, seed_classes, timed
+from src import serialization
+from src.models.attendance import Attendance
+from src.models.user import db
+
+
+def orm_path():
+    attendances = Attendance.query.all()
+    return json.dumps([attendance.to_dict() for attendance in attendances])
+
+
+def tuple_path():
+    columns = [getattr(Attendance, name) for name in Attendance.__table__.columns.keys()]
+    rows = db.session.query(*columns).all()
+    encode = serialization.row_encoder(columns)
+    return serialization.dumps([encode(row) for row in rows])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    seed_classes(app, 50, 40)
+    with app.app_context():
+        fill_attendances(db.engine.url.database, args.rows, 50, 40)
+
+    orjson = serialization.orjson
+    scenarios = [('ORM + to_dict + json', orm_path, None), ('tuplas + json', tuple_path, None)]
+    if orjson:
+        scenarios.append(('tuplas + orjson', tuple_path, orjson))
+
+    print(f'{args.rows} registros de frequência')
+    for name, fn, backend in scenarios:
+        serialization.orjson = backend
+        best = None
+        with app.app_context():
+            for _ in range(args.repeat):
+                elapsed, _ = timed(fn)
+                db.session.remove()
+                best = elapsed if best is None else min(best, elapsed)
+        print(f'{name:>24}: {best * 1000:8.1f} ms  {args.rows / best:>10.0f} linhas/s')
+    serialization.orjson = orjson
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# Tempo até a primeira requisição de um worker recém-iniciado: importação do
+# src.main (create_app), login e primeira listagem. Cada amostra roda em um
+# processo novo, como um worker do gunicorn.
+#
+#   python -m benchmarks.bench_startup --workers 10
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+WORKER = '''
+import json, sys, time
+start = time.perf_counter()
+from src.main import app
+imported = time.perf_counter()
+client = app.test_client()
+client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+logged_in = time.perf_counter()
+assert client.get('/api/classes').status_code == 200
+first_request = time.perf_counter()
+print(json.dumps({
+    'import': imported - start,
+    'login': logged_in - imported,
+    'first_request': first_request - start
+}))
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=10)
+    args = parser.parse_args()
+
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-'), 'app.db')}")
+    for command in ('init-db', 'seed'):
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'src.main', command],
+                       cwd=backend, env=env, check=True, capture_output=True)
+
+    samples = []
+    for _ in range(args.workers):
+        output = subprocess.run([sys.executable, '-c', WORKER], cwd=backend, env=env,
+                                check=True, capture_output=True, text=True).stdout
+        samples.append(json.loads(output))
+
+    for key, label in (('import', 'importação + create_app'), ('login', 'login'), ('first_request', 'até a primeira listagem')):
+        values = [sample[key] * 1000 for sample in samples]
+        print(f'{label:>26}: mediana {statistics.median(values):7.1f} ms  máximo {max(values):7.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# Bytes transferidos e requisições/s do frontend estático no carregamento da
+# tela de login (index.html + bundle JS + CSS), comparando o serve_frontend
+# antigo (os.path.exists + send_from_directory, sem compressão) com o índice
+# em memória, gzip/brotli negociados e revalidação do index.html.
+#
+#   python -m benchmarks.bench_static --requests 300
+import argparse
+import os
+import shutil
+import tempfile
+
+from flask import send_from_directory
+
+from benchmarks.common import create_bench_app, timed
+from src.static_assets import brotli, precompress_static
+
+FRONTEND = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'frontend')
+BUNDLE_SOURCE = os.path.join(FRONTEND, 'node_modules', 'react-dom', 'umd', 'react-dom.production.min.js')
+CSS_SOURCE = os.path.join(FRONTEND, 'src', 'App.css')
+PAGE = ('/', '/assets/index-4f2a9c1b.js', '/assets/index-9d8e7f6a.css')
+
+
+def build_static(root):
+    # Estrutura de um vite build; usa o react-dom minificado como bundle
+    # quando o node_modules do frontend está presente
+    os.makedirs(os.path.join(root, 'assets'))
+    if os.path.exists(BUNDLE_SOURCE):
+        shutil.copy(BUNDLE_SOURCE, os.path.join(root, 'assets', 'index-4f2a9c1b.js'))
+    else:
+        with open(os.path.join(root, 'assets', 'index-4f2a9c1b.js'), 'w') as output:
+            output.write(''.join(f'function c{n}(e){{return e.map(t=>t*{n}).filter(Boolean)}}\n' for n in range(4000)))
+    css = open(CSS_SOURCE).read() if os.path.exists(CSS_SOURCE) else '.app{display:flex}\n' * 500
+    with open(os.path.join(root, 'assets', 'index-9d8e7f6a.css'), 'w') as output:
+        output.write(css * 4)
+    with open(os.path.join(root, 'index.html'), 'w') as output:
+        output.write('<!doctype html><html lang="pt-BR"><head><meta charset="UTF-8"><title>Frequência Escolar</title>'
+                     '<script type="module" crossorigin src="/assets/index-4f2a9c1b.js"></script>'
+                     '<link rel="stylesheet" href="/assets/index-9d8e7f6a.css"></head>'
+                     '<body><div id="root"></div></body></html>\n' + '<!-- -->\n' * 100)
+
+
+def old_app(root):
+    # A aplicação atual com a view antiga no lugar de serve_frontend, para
+    # que os demais hooks (cabeçalhos, métricas) pesem igual nos dois lados
+    app = create_bench_app(seed=False)
+    app.static_folder = root
+
+    def serve_frontend(path=''):
+        if path != "" and os.path.exists(os.path.join(app.static_folder, path)):
+            return send_from_directory(app.static_folder, path)
+        else:
+            return send_from_directory(app.static_folder, 'index.html')
+
+    app.view_functions['serve_frontend'] = serve_frontend
+    return app
+
+
+def new_app(root):
+    app = create_bench_app(seed=False)
+    app.static_folder = root
+    return app
+
+
+def visit(client, headers):
+    # Primeira visita: index.html e os dois bundles
+    transferred = 0
+    for path in PAGE:
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.status_code
+        transferred += len(response.data)
+    return transferred, len(PAGE)
+
+
+def revisit(client, headers, etag):
+    # Com cache: só o index.html é revalidado; os bundles imutáveis não são
+    # pedidos de novo dentro do max-age
+    response = client.get('/', headers=dict(headers, **{'If-None-Match': etag}))
+    assert response.status_code == 304, response.status_code
+    return len(response.data), 1
+
+
+def measure(client, headers, requests, cached):
+    if cached:
+        etag = client.get('/', headers=headers).headers['ETag']
+        load = lambda: revisit(client, headers, etag)
+    else:
+        load = lambda: visit(client, headers)
+    load()
+    elapsed, results = timed(lambda: [load() for _ in range(requests)])
+    return sum(size for size, _ in results) / requests, sum(count for _, count in results) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='static-')
+    build_static(root)
+    new = new_app(root)
+
+    precompressed_root = tempfile.mkdtemp(prefix='static-')
+    shutil.rmtree(precompressed_root)
+    shutil.copytree(root, precompressed_root)
+    precompress_static(precompressed_root)
+    prebuilt = new_app(precompressed_root)
+
+    scenarios = [
+        ('antigo, sem compressão', old_app(root), {}, False),
+        ('antigo, Accept-Encoding gzip', old_app(root), {'Accept-Encoding': 'gzip'}, False),
+        ('índice, identity', new, {}, False),
+        ('índice, gzip no 1º acesso', new, {'Accept-Encoding': 'gzip'}, False),
+        ('índice, .gz do compress-static', prebuilt, {'Accept-Encoding': 'gzip'}, False),
+    ]
+    if brotli:
+        scenarios.append(('índice, br', prebuilt, {'Accept-Encoding': 'br, gzip'}, False))
+    scenarios.append(('índice, revisita (304 + imutáveis)', new, {'Accept-Encoding': 'gzip'}, True))
+
+    print(f'{"cenário":>36}  {"bytes/visita":>12}  {"req/s":>8}')
+    for name, app, headers, cached in scenarios:
+        transferred, rate = measure(app.test_client(), headers, args.requests, cached)
+        print(f'{name:>36}  {transferred:12.0f}  {rate:8.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# Vazão da importação de estudantes: POST /api/students/import com um CSV de
+# 50 mil linhas contra POST /api/students um estudante por vez (medido em
+# uma amostra, já que a rota individual levaria minutos para 50 mil).
+#
+#   python -m benchmarks.bench_student_import --rows 50000 --single 2000
+import argparse
+
+from benchmarks.common import create_bench_app, login, seed_classes, timed
+from src.models.user import db
+from src.models.student import Student
+
+
+def student_rows(count, class_ids, prefix):
+    for n in range(count):
+        yield {
+            'student_id': f'{prefix}{n}',
+            'name': f'Aluno {prefix}{n}',
+            'email': f'aluno{prefix}{n}@escola.com.br',
+            'birth_date': '2012-03-15',
+            'class_id': class_ids[n % len(class_ids)]
+        }
+
+
+def csv_body(rows):
+    lines = ['student_id,name,email,birth_date,class_id']
+    lines.extend(f"{row['student_id']},{row['name']},{row['email']},{row['birth_date']},{row['class_id']}" for row in rows)
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def bench_single(rows, class_ids):
+    app = create_bench_app()
+    seed_classes(app, len(class_ids), 0)
+    client = login(app)
+
+    def insert_all():
+        for row in student_rows(rows, class_ids, 'S'):
+            response = client.post('/api/students', json=row)
+            assert response.status_code == 201, response.get_json()
+
+    elapsed, _ = timed(insert_all)
+    return rows / elapsed
+
+
+def bench_import(rows, class_ids, chunk_size):
+    app = create_bench_app(IMPORT_CHUNK_SIZE=chunk_size)
+    # Estudantes já cadastrados, para que a verificação de unicidade consulte
+    # uma tabela com dados
+    seed_classes(app, len(class_ids), 500)
+    client = login(app)
+    body = csv_body(student_rows(rows, class_ids, 'I'))
+
+    elapsed, response = timed(client.post, '/api/students/import', data=body, content_type='text/csv')
+    report = response.get_json()
+    assert response.status_code == 200 and report['imported'] == rows, report
+    with app.app_context():
+        assert db.session.query(Student).count() == rows + 500 * len(class_ids)
+    return rows / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--single', type=int, default=2000)
+    parser.add_argument('--classes', type=int, default=20)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+    class_ids = list(range(1, args.classes + 1))
+
+    single = bench_single(args.single, class_ids)
+    print(f'POST /api/students (um por vez, {args.single} linhas): {single:10.0f} linhas/s')
+    bulk = bench_import(args.rows, class_ids, args.chunk_size)
+    print(f'POST /api/students/import ({args.rows} linhas):       {bulk:10.0f} linhas/s')
+    print(f'ganho: {bulk / single:.1f}x; 50 mil um por vez levariam ~{50000 / single:.0f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# Latência do GET /api/students/search (FTS5 com bm25) em 100 mil estudantes
+# com nomes acentuados, comparada com a mesma busca feita com LIKE sobre as
+# quatro colunas e com o fluxo antigo (baixar todos e filtrar no cliente).
+#
+#   python -m benchmarks.bench_student_search --students 100000
+import argparse
+import random
+import sqlite3
+import statistics
+import unicodedata
+
+from benchmarks.common import create_bench_app, login, percentile, seed_classes, timed
+from src.models.user import db
+from src.search import SEARCH_COLUMNS
+
+FIRST_NAMES = ('João', 'José', 'Maria', 'Ana', 'Márcio', 'Luís', 'Letícia', 'Conceição', 'Inês', 'Sérgio',
+               'Antônio', 'Fábio', 'Lúcia', 'Mônica', 'Vitória', 'Gabriel', 'Rafaela', 'Caio', 'Bárbara', 'Otávio')
+LAST_NAMES = ('Silva', 'Souza', 'Araújo', 'Gonçalves', 'Conceição', 'Pereira', 'Lima', 'Brandão', 'Magalhães',
+              'Assunção', 'Fernandes', 'Rocha', 'Simões', 'Peixoto', 'Nóbrega', 'Gusmão', 'Falcão', 'Barbosa')
+# Consultas como digitadas no campo de busca: sem acento, prefixos e matrícula
+QUERIES = ('joao', 'conceicao silva', 'mar', 'let ara', 'goncalves', 'assuncao nobrega', '2024-0042', 'fab pei')
+
+
+def fill_students(db_path, count, classes):
+    # Direto pelo sqlite3; os gatilhos alimentam o índice FTS5
+    random.seed(42)
+    connection = sqlite3.connect(db_path)
+
+    def generate():
+        for n in range(count):
+            name = f'{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)} {random.choice(LAST_NAMES)}'
+            parent = f'{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}'
+            email = unicodedata.normalize('NFKD', name.lower().replace(' ', '.')).encode('ascii', 'ignore').decode() + f'{n}@escola.com.br'
+            yield (f'2024-{n:05d}', name, email, parent, n % classes + 1, 1)
+
+    connection.executemany(
+        'INSERT INTO students (student_id, name, email, parent_name, class_id, is_active) VALUES (?, ?, ?, ?, ?, ?)',
+        generate()
+    )
+    connection.commit()
+    connection.close()
+
+
+def like_search(connection, query, limit=20):
+    # Busca equivalente sem índice: cada palavra em alguma das colunas
+    terms = query.split()
+    where = ' AND '.join('(' + ' OR '.join(f'{name} LIKE ?' for name in SEARCH_COLUMNS) + ')' for _ in terms)
+    params = [f'%{term}%' for term in terms for _ in SEARCH_COLUMNS]
+    return connection.execute(
+        f'SELECT * FROM students WHERE is_active = 1 AND {where} ORDER BY name, id LIMIT {limit}', params
+    ).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--classes', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_bench_app(PAGINATION_MAX_LIMIT=args.students)
+    seed_classes(app, args.classes, 0)
+    with app.app_context():
+        db_path = db.engine.url.database
+    elapsed, _ = timed(fill_students, db_path, args.students, args.classes)
+    print(f'{args.students} estudantes inseridos (com gatilhos FTS5) em {elapsed:.1f}s')
+    client = login(app)
+    connection = sqlite3.connect(db_path)
+
+    print(f'{"consulta":>18}  {"FTS5 p50":>9} {"p95":>8}  {"LIKE p50":>9}  resultados')
+    for query in QUERIES:
+        fts, like = [], []
+        for _ in range(args.rounds):
+            elapsed, response = timed(client.get, '/api/students/search', query_string={'q': query})
+            assert response.status_code == 200, response.get_json()
+            fts.append(elapsed * 1000)
+            elapsed, _ = timed(like_search, connection, query)
+            like.append(elapsed * 1000)
+        print(f'{query:>18}  {statistics.median(fts):7.2f}ms {percentile(fts, 0.95):6.2f}ms  '
+              f'{statistics.median(like):7.2f}ms  {len(response.get_json()):>4}')
+
+    elapsed, response = timed(client.get, f'/api/students?limit={args.students}')
+    print(f'fluxo antigo (baixar todos): {elapsed * 1000:.0f} ms, {len(response.data)} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+# Suíte de carga repetível do pico das 8h: cria uma rede de escolas sintética
+# em um SQLite temporário e mede login, roster da turma (folha de chamada),
+# envio da chamada em lote e estatísticas, primeiro pelo test client (uma
+# requisição por vez) e depois por HTTP local com várias conexões simultâneas.
+# Grava p50/p95/p99 e vazão em JSON e compara com uma execução anterior.
+#
+#   python -m benchmarks.bench_suite --output resultados.json
+#   python -m benchmarks.bench_suite --baseline resultados.json --fail-on-regression
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from benchmarks.common import create_bench_app, login, percentile, seed_district, timed
+
+# Peso de cada cenário na carga HTTP simultânea
+SCENARIO_WEIGHTS = {'roster': 4, 'roll_call': 3, 'statistics': 2, 'login': 1}
+
+
+class Scenarios:
+    # Cada cenário devolve (método, caminho, corpo JSON) da próxima requisição
+    def __init__(self, class_ids, rosters, peak_day):
+        self.class_ids = class_ids
+        self.rosters = rosters
+        self.peak_day = peak_day
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def next_class(self):
+        with self._lock:
+            self._next += 1
+            return self.class_ids[self._next % len(self.class_ids)]
+
+    def login(self):
+        return 'POST', '/api/auth/login', {'username': 'professor', 'password': 'prof123'}
+
+    def roster(self):
+        return 'GET', f'/api/classes/{self.next_class()}/sheet?date={self.peak_day}', None
+
+    def roll_call(self):
+        class_id = self.next_class()
+        statuses = ('present', 'present', 'present', 'absent', 'late')
+        return 'POST', '/api/attendance/batch', {
+            'class_id': class_id,
+            'date': self.peak_day,
+            'records': [
+                {'student_id': student_id, 'status': random.choice(statuses)}
+                for student_id in self.rosters[class_id]
+            ]
+        }
+
+    def statistics(self):
+        return 'GET', '/api/attendance/statistics', None
+
+
+def summarize(latencies, elapsed, errors):
+    latencies = [value * 1000 for value in latencies]
+    return {
+        'count': len(latencies),
+        'errors': errors,
+        'p50_ms': round(statistics.median(latencies), 3) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95), 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99), 3) if latencies else None,
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else None
+    }
+
+
+def run_client(app, scenarios, requests, logins):
+    # Requisições sequenciais pelo test client, sem rede
+    client = login(app)
+    results = {}
+    for name in SCENARIO_WEIGHTS:
+        count = logins if name == 'login' else requests
+        latencies, errors = [], 0
+        start = time.perf_counter()
+        for _ in range(count):
+            method, path, body = getattr(scenarios, name)()
+            elapsed, response = timed(client.open, path, method=method, json=body)
+            latencies.append(elapsed)
+            if response.status_code >= 400:
+                errors += 1
+        results[name] = summarize(latencies, time.perf_counter() - start, errors)
+    return results
+
+
+class KeepAliveHandler(WSGIRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_request(self, *args):
+        pass
+
+
+def run_http(app, scenarios, concurrency, duration):
+    # Servidor local com uma thread por conexão e `concurrency` clientes
+    # mantendo conexões HTTP/1.1 abertas durante `duration` segundos
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    session = login(app).get_cookie('session').value
+    names = list(SCENARIO_WEIGHTS)
+    weights = [SCENARIO_WEIGHTS[name] for name in names]
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(seed):
+        chooser = random.Random(seed)
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        while time.perf_counter() < deadline:
+            name = chooser.choices(names, weights)[0]
+            method, path, body = getattr(scenarios, name)()
+            headers = {'Cookie': f'session={session}'}
+            payload = None
+            if body is not None:
+                payload = json.dumps(body)
+                headers['Content-Type'] = 'application/json'
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                failed = response.status >= 400
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                failed = True
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[name].append(elapsed)
+                errors[name] += failed
+        connection.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    results = {name: summarize(latencies[name], elapsed, errors[name]) for name in names}
+    everything = [value for values in latencies.values() for value in values]
+    results['total'] = summarize(everything, elapsed, sum(errors.values()))
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    # Regressão: p95 maior ou vazão menor que a base em mais de `threshold`
+    regressions = []
+    print(f'\ncomparação com {baseline["meta"]["timestamp"]} ({baseline["meta"].get("commit")})')
+    for phase, scenarios in results['results'].items():
+        for name, current in scenarios.items():
+            previous = baseline['results'].get(phase, {}).get(name)
+            if not previous or not previous['p95_ms'] or not current['p95_ms']:
+                continue
+            p95 = current['p95_ms'] / previous['p95_ms'] - 1
+            throughput = current['throughput_rps'] / previous['throughput_rps'] - 1
+            regressed = p95 > threshold or throughput < -threshold
+            if regressed:
+                regressions.append(f'{phase}/{name}')
+            print(f'{phase:>7} {name:>11}: p95 {p95:+7.1%}  vazão {throughput:+7.1%}{"  REGRESSÃO" if regressed else ""}')
+    return regressions
+
+
+def print_results(results):
+    for phase, scenarios in results['results'].items():
+        print(f'\n{phase}')
+        for name, value in scenarios.items():
+            if not value['count']:
+                continue
+            print(f'{name:>11}: {value["count"]:6d} req  p50 {value["p50_ms"]:8.2f} ms  p95 {value["p95_ms"]:8.2f} ms  '
+                  f'p99 {value["p99_ms"]:8.2f} ms  {value["throughput_rps"]:8.1f} req/s  {value["errors"]} erros')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--schools', type=int, default=2)
+    parser.add_argument('--classes-per-school', type=int, default=10)
+    parser.add_argument('--students-per-class', type=int, default=30)
+    parser.add_argument('--years', type=int, default=1)
+    parser.add_argument('--days-per-year', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=200, help='requisições por cenário no test client')
+    parser.add_argument('--logins', type=int, default=10, help='logins no test client (pbkdf2 é lento)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help='segundos de carga HTTP')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline')
+    parser.add_argument('--threshold', type=float, default=0.10)
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    app = create_bench_app()
+    elapsed, (class_ids, rosters, days) = timed(
+        seed_district, app, args.schools, args.classes_per_school, args.students_per_class,
+        args.years, args.days_per_year
+    )
+    students = sum(len(roster) for roster in rosters.values())
+    print(f'rede criada em {elapsed:.1f}s: {args.schools} escolas, {len(class_ids)} turmas, '
+          f'{students} estudantes, {students * len(days)} frequências')
+
+    # O pico é a chamada de um dia novo, logo depois do histórico
+    peak_day = days[-1].replace(year=days[-1].year + 1).isoformat()
+    scenarios = Scenarios(class_ids, rosters, peak_day)
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'args': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')}
+        },
+        'results': {
+            'client': run_client(app, scenarios, args.requests, args.logins),
+            'http': run_http(app, scenarios, args.concurrency, args.duration)
+        }
+    }
+    print_results(results)
+
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(results, output, indent=2)
+    print(f'\nresultados gravados em {args.output}')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline:
+            regressions = compare(results, json.load(baseline), args.threshold)
+        if regressions and args.fail_on_regression:
+            print(f'regressões: {", ".join(regressions)}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, select
+from src.main import create_app
+from src.cli import init_database
+from src.models.user import User, db
+from src.models.school import School
+from src.models.class_model import Class
+from src.models.student import Student
+from src.models.attendance_summary import rebuild_summaries
+from src.models.absence_state import rebuild_absence_states
+
+
+def create_bench_app(db_path=None, seed=True, **config):
+    # A aplicação real, apontando para um banco temporário
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')
+    app = create_app(dict({'SECRET_KEY': 'bench', 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}'}, **config))
+    if not seed:
+        return app
+    with app.app_context():
+        init_database()
+        admin = User(username='admin', role='admin')
+        admin.set_password('admin123')
+        db.session.add(admin)
+        db.session.add(School(name='Escola Benchmark'))
+        db.session.commit()
+    return app
+
+
+def seed_classes(app, classes, students_per_class):
+    with app.app_context():
+        class_ids = []
+        for i in range(classes):
+            cls = Class(name=f'Turma {i}', grade='5º Ano', year=2024, teacher='Professor', school_id=1)
+            db.session.add(cls)
+            db.session.flush()
+            class_ids.append(cls.id)
+        db.session.commit()
+        rows = [
+            {
+                'student_id': f'{class_id}-{n}',
+                'name': f'Aluno {class_id}-{n}',
+                'email': f'aluno{class_id}-{n}@escola.com.br',
+                'class_id': class_id,
+                'is_active': True
+            }
+            for class_id in class_ids
+            for n in range(students_per_class)
+        ]
+        if rows:
+            db.session.execute(Student.__table__.insert(), rows)
+            db.session.commit()
+        return class_ids
+
+
+def fill_attendances(db_path, rows, classes, students_per_class, first_day=date(2015, 2, 1)):
+    # Insere frequências sintéticas direto pelo sqlite3 (muito mais rápido que
+    # o ORM); um registro por estudante por dia, devolve o número de dias
+    connection = sqlite3.connect(db_path)
+    students = classes * students_per_class
+    days = -(-rows // students)
+    start = first_day.toordinal()
+    statuses = ('present', 'present', 'present', 'absent', 'late')
+
+    def generate():
+        produced = 0
+        for day in range(days):
+            day_iso = date.fromordinal(start + day).isoformat()
+            for student in range(students):
+                if produced == rows:
+                    return
+                produced += 1
+                yield (student + 1, student // students_per_class + 1, day_iso, statuses[(student + day) % 5], 1)
+
+    connection.executemany(
+        'INSERT INTO attendances (student_id, class_id, date, status, recorded_by) VALUES (?, ?, ?, ?, ?)',
+        generate()
+    )
+    connection.commit()
+    connection.close()
+    return days
+
+
+def school_days(years, days_per_year, first_year=2024):
+    # Dias letivos (segunda a sexta) a partir de fevereiro de cada ano
+    days = []
+    for year in range(first_year - years + 1, first_year + 1):
+        day = date(year, 2, 1)
+        produced = 0
+        while produced < days_per_year:
+            if day.weekday() < 5:
+                days.append(day)
+                produced += 1
+            day += timedelta(days=1)
+    return days
+
+
+def seed_district(app, schools, classes_per_school, students_per_class, years, days_per_year=200, first_year=2024):
+    # Rede de escolas sintética: turmas, estudantes, um professor e o
+    # histórico de frequências dos últimos `years` anos letivos, com os
+    # resumos recalculados. Devolve as turmas, os rosters e os dias letivos
+    with app.app_context():
+        professor = User(username='professor', role='teacher')
+        professor.set_password('prof123')
+        db.session.add(professor)
+        school_ids = []
+        for i in range(1, schools):
+            school = School(name=f'Escola {i}')
+            db.session.add(school)
+            db.session.flush()
+            school_ids.append(school.id)
+        db.session.commit()
+        school_ids.insert(0, 1)
+
+        classes = [
+            Class(name=f'Turma {school_id}-{n}', grade=f'{n % 9 + 1}º Ano', year=2024, teacher='Professor', school_id=school_id)
+            for school_id in school_ids
+            for n in range(classes_per_school)
+        ]
+        db.session.add_all(classes)
+        db.session.commit()
+        class_ids = [cls.id for cls in classes]
+
+        db.session.execute(Student.__table__.insert(), [
+            {
+                'student_id': f'{class_id}-{n}',
+                'name': f'Aluno {class_id}-{n}',
+                'email': f'aluno{class_id}-{n}@escola.com.br',
+                'class_id': class_id,
+                'is_active': True
+            }
+            for class_id in class_ids
+            for n in range(students_per_class)
+        ])
+        db.session.commit()
+        rosters = {class_id: [] for class_id in class_ids}
+        for student_id, class_id in db.session.execute(select(Student.id, Student.class_id).order_by(Student.id)):
+            rosters[class_id].append(student_id)
+        db_path = db.engine.url.database
+
+    days = school_days(years, days_per_year, first_year)
+    statuses = ('present', 'present', 'present', 'present', 'present', 'present', 'absent', 'late')
+    connection = sqlite3.connect(db_path)
+    connection.executemany(
+        'INSERT INTO attendances (student_id, class_id, date, status, recorded_by) VALUES (?, ?, ?, ?, 1)',
+        (
+            (student_id, class_id, day.isoformat(), statuses[(student_id * 7 + index) % len(statuses)])
+            for index, day in enumerate(days)
+            for class_id, roster in rosters.items()
+            for student_id in roster
+        )
+    )
+    connection.commit()
+    connection.close()
+
+    with app.app_context():
+        rebuild_summaries()
+        rebuild_absence_states()
+    return class_ids, rosters, days
+
+
+def login(app, username='admin', password='admin123'):
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'username': username, 'password': password})
+    assert response.status_code == 200, response.get_json()
+    return client
+
+
+class QueryCounter:
+    # Conta os comandos SQL emitidos pelo engine enquanto ativo
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def school_day(offset):
+    return date.fromordinal(date(2024, 2, 1).toordinal() + offset).isoformat()
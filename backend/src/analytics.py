@@ -0,0 +1,320 @@
+from collections import defaultdict
+from datetime import date
+from itertools import chain
+
+from sqlalchemy import Integer, case, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from src.models.user import db
+from src.models.attendance import Attendance
+
+# numpy é opcional: sem ele os mesmos agregados são calculados em laços
+# Python, bem mais lentos em períodos longos
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Configuração:
+#   ANALYTICS_CHRONIC_RATE  taxa de faltas a partir da qual o estudante conta
+#                           como infrequente na comparação entre coortes
+ANALYTICS_CHRONIC_RATE = 0.10
+ANALYTICS_BATCH_SIZE = 100000
+STATUS_CODES = ('present', 'absent', 'late')
+PRESENT, ABSENT, LATE = range(len(STATUS_CODES))
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+WEEKDAYS = ('segunda', 'terça', 'quarta', 'quinta', 'sexta', 'sábado', 'domingo')
+COHORT_FIELDS = ('grade', 'school_id', 'year')
+
+
+class epoch_days(FunctionElement):
+    # Dias desde 1970-01-01 calculados no banco: evita converter milhões de
+    # datas em objetos date no Python
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(epoch_days, 'sqlite')
+def _epoch_days_sqlite(element, compiler, **kw):
+    return f'CAST(julianday({compiler.process(element.clauses, **kw)}) - 2440587.5 AS INTEGER)'
+
+
+@compiles(epoch_days)
+def _epoch_days_default(element, compiler, **kw):
+    return f"({compiler.process(element.clauses, **kw)} - DATE '1970-01-01')"
+
+
+class AttendanceColumns:
+    # Frequências do escopo em colunas: arrays do numpy quando instalado,
+    # listas caso contrário. day = dias desde 1970-01-01, status = índice em STATUS_CODES
+    def __init__(self, student_id, class_id, day, status):
+        self.student_id = student_id
+        self.class_id = class_id
+        self.day = day
+        self.status = status
+
+    def __len__(self):
+        return len(self.day)
+
+    def tolist(self):
+        if np is None or isinstance(self.day, list):
+            return self
+        return AttendanceColumns(self.student_id.tolist(), self.class_id.tolist(), self.day.tolist(), self.status.tolist())
+
+
+def columns_query(class_ids=None, date_from=None, date_to=None):
+    query = select(
+        Attendance.student_id,
+        Attendance.class_id,
+        epoch_days(Attendance.date),
+        case(*[(Attendance.status == status, code) for code, status in enumerate(STATUS_CODES)])
+    ).where(Attendance.status.in_(STATUS_CODES))
+    if class_ids is not None:
+        query = query.where(Attendance.class_id.in_(class_ids))
+    if date_from:
+        query = query.where(Attendance.date >= date_from)
+    if date_to:
+        query = query.where(Attendance.date <= date_to)
+    return query
+
+
+def fetch_blocks(connection, query, batch_size):
+    # Tuplas direto do cursor do DBAPI: montar um Row do SQLAlchemy por
+    # linha custa mais que a própria consulta em milhões de linhas. Sem
+    # stream_results, que guardaria as primeiras linhas no buffer do Result
+    result = connection.execute(query)
+    try:
+        while True:
+            rows = result.cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        result.close()
+
+
+def iter_blocks(query, batch_size, archives=()):
+    # Anos arquivados primeiro, depois a tabela principal
+    for engine in archives:
+        with engine.connect() as connection:
+            yield from fetch_blocks(connection, query, batch_size)
+    yield from fetch_blocks(db.session.connection(), query, batch_size)
+
+
+def load_columns(class_ids=None, date_from=None, date_to=None, archives=(), vectorized=None,
+                 batch_size=ANALYTICS_BATCH_SIZE):
+    # Uma única consulta por partição (anos arquivados e tabela principal),
+    # lida em lotes e convertida em colunas
+    if vectorized is None:
+        vectorized = np is not None
+    query = columns_query(class_ids, date_from, date_to)
+    if vectorized:
+        blocks = [
+            np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=len(rows) * 4).reshape(-1, 4)
+            for rows in iter_blocks(query, batch_size, archives)
+        ]
+        table = np.concatenate(blocks) if blocks else np.empty((0, 4), dtype=np.int64)
+        return AttendanceColumns(table[:, 0], table[:, 1], table[:, 2], table[:, 3])
+
+    student_id, class_id, day, status = [], [], [], []
+    for rows in iter_blocks(query, batch_size, archives):
+        for row in rows:
+            student_id.append(row[0])
+            class_id.append(row[1])
+            day.append(row[2])
+            status.append(row[3])
+    return AttendanceColumns(student_id, class_id, day, status)
+
+
+def to_date(day):
+    return date.fromordinal(EPOCH_ORDINAL + day)
+
+
+def absence_rate(absent, total):
+    return round(absent / total, 4) if total else None
+
+
+def _dense(values):
+    # Valores distintos (ordenados) e o índice de cada elemento entre eles,
+    # por contagem em vez de ordenação: ids e dias ocupam faixas estreitas
+    if not len(values):
+        return values[:0], values[:0]
+    low = int(values.min())
+    shifted = values - low
+    present = np.flatnonzero(np.bincount(shifted))
+    lookup = np.zeros(present[-1] + 1, dtype=np.int64)
+    lookup[present] = np.arange(len(present))
+    return present + low, lookup[shifted]
+
+
+# Mapa de calor: taxa de faltas por turma e dia
+
+def heatmap_counts(columns):
+    if not isinstance(columns.day, list):
+        classes, class_index = _dense(columns.class_id)
+        days, day_index = _dense(columns.day)
+        cells = class_index * len(days) + day_index
+        size = len(classes) * len(days)
+        total = np.bincount(cells, minlength=size).reshape(len(classes), len(days))
+        absent = np.bincount(cells[columns.status == ABSENT], minlength=size).reshape(len(classes), len(days))
+        return classes.tolist(), days.tolist(), total.tolist(), absent.tolist()
+
+    total = defaultdict(int)
+    absent = defaultdict(int)
+    for class_id, day, status in zip(columns.class_id, columns.day, columns.status):
+        total[(class_id, day)] += 1
+        if status == ABSENT:
+            absent[(class_id, day)] += 1
+    classes = sorted({class_id for class_id, _ in total})
+    days = sorted({day for _, day in total})
+    return (
+        classes, days,
+        [[total.get((class_id, day), 0) for day in days] for class_id in classes],
+        [[absent.get((class_id, day), 0) for day in days] for class_id in classes]
+    )
+
+
+def heatmap(columns):
+    classes, days, total, absent = heatmap_counts(columns)
+    return {
+        'classes': classes,
+        'dates': [to_date(day).isoformat() for day in days],
+        'totals': total,
+        'absence_rate': [
+            [absence_rate(absences, records) for records, absences in zip(class_total, class_absent)]
+            for class_total, class_absent in zip(total, absent)
+        ]
+    }
+
+
+# Padrão semanal: presenças, faltas e atrasos por dia da semana
+
+def weekday_counts(columns):
+    # 1970-01-01 foi uma quinta-feira (3, com segunda = 0)
+    if not isinstance(columns.day, list):
+        weekday = (columns.day + 3) % 7
+        return np.bincount(weekday * 3 + columns.status, minlength=21).reshape(7, 3).tolist()
+
+    counts = [[0, 0, 0] for _ in range(7)]
+    for day, status in zip(columns.day, columns.status):
+        counts[(day + 3) % 7][status] += 1
+    return counts
+
+
+def weekdays(columns):
+    result = []
+    for weekday, counts in enumerate(weekday_counts(columns)):
+        total = sum(counts)
+        if not total:
+            continue
+        result.append(dict(
+            {status: counts[code] for code, status in enumerate(STATUS_CODES)},
+            weekday=weekday,
+            name=WEEKDAYS[weekday],
+            total=total,
+            absence_rate=absence_rate(counts[ABSENT], total)
+        ))
+    return result
+
+
+# Coortes: turmas agrupadas (série, escola ou ano) comparadas entre si e mês a mês
+
+def cohort_counts(columns, class_cohorts, cohort_count, chronic_rate):
+    # class_cohorts: id da turma -> índice da coorte. Devolve por coorte as
+    # turmas, os totais por status, estudantes, estudantes infrequentes e a
+    # série mensal (meses desde 1970-01) de registros e faltas
+    if not isinstance(columns.day, list):
+        lookup = np.full(max(class_cohorts, default=0) + 1, -1, dtype=np.int64)
+        lookup[list(class_cohorts)] = list(class_cohorts.values())
+        class_id = columns.class_id
+        known = class_id < len(lookup)
+        cohort = np.full(len(class_id), -1, dtype=np.int64)
+        cohort[known] = lookup[class_id[known]]
+        keep = cohort >= 0
+        cohort, student_id, class_id = cohort[keep], columns.student_id[keep], class_id[keep]
+        status, day = columns.status[keep], columns.day[keep]
+        absent = status == ABSENT
+
+        statuses = np.bincount(cohort * 3 + status, minlength=cohort_count * 3).reshape(cohort_count, 3)
+        classes = np.bincount(lookup[_dense(class_id)[0]], minlength=cohort_count)
+
+        students, student_index = _dense(student_id)
+        pairs, pair_index = _dense(cohort * len(students) + student_index)
+        pair_total = np.bincount(pair_index)
+        pair_absent = np.bincount(pair_index, weights=absent)
+        pair_cohort = pairs // max(len(students), 1)
+        student_counts = np.bincount(pair_cohort, minlength=cohort_count)
+        chronic = np.bincount(pair_cohort, weights=pair_absent / pair_total >= chronic_rate, minlength=cohort_count)
+
+        month = day.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        months, month_index = _dense(month)
+        cells = cohort * len(months) + month_index
+        size = cohort_count * len(months)
+        month_total = np.bincount(cells, minlength=size).reshape(cohort_count, len(months))
+        month_absent = np.bincount(cells[absent], minlength=size).reshape(cohort_count, len(months))
+        return (
+            classes.tolist(), statuses.tolist(), student_counts.tolist(), chronic.astype(np.int64).tolist(),
+            months.tolist(), month_total.tolist(), month_absent.tolist()
+        )
+
+    classes = [set() for _ in range(cohort_count)]
+    statuses = [[0, 0, 0] for _ in range(cohort_count)]
+    pairs = defaultdict(lambda: [0, 0])
+    month_cells = defaultdict(lambda: [0, 0])
+    for student_id, class_id, day, status in zip(columns.student_id, columns.class_id, columns.day, columns.status):
+        cohort = class_cohorts.get(class_id)
+        if cohort is None:
+            continue
+        classes[cohort].add(class_id)
+        statuses[cohort][status] += 1
+        absent = status == ABSENT
+        pair = pairs[(cohort, student_id)]
+        pair[0] += 1
+        pair[1] += absent
+        day = to_date(day)
+        cell = month_cells[(cohort, (day.year - 1970) * 12 + day.month - 1)]
+        cell[0] += 1
+        cell[1] += absent
+
+    student_counts = [0] * cohort_count
+    chronic = [0] * cohort_count
+    for (cohort, _), (total, absent) in pairs.items():
+        student_counts[cohort] += 1
+        chronic[cohort] += absent / total >= chronic_rate
+    months = sorted({month for _, month in month_cells})
+    return (
+        [len(cohort_classes) for cohort_classes in classes], statuses, student_counts, chronic, months,
+        [[month_cells.get((cohort, month), (0, 0))[0] for month in months] for cohort in range(cohort_count)],
+        [[month_cells.get((cohort, month), (0, 0))[1] for month in months] for cohort in range(cohort_count)]
+    )
+
+
+def cohorts(columns, class_cohorts, cohort_names, chronic_rate=ANALYTICS_CHRONIC_RATE):
+    classes, statuses, students, chronic, months, month_total, month_absent = cohort_counts(
+        columns, class_cohorts, len(cohort_names), chronic_rate
+    )
+    result = []
+    for index, name in enumerate(cohort_names):
+        total = sum(statuses[index])
+        if not total:
+            continue
+        result.append(dict(
+            {status: statuses[index][code] for code, status in enumerate(STATUS_CODES)},
+            cohort=name,
+            classes=classes[index],
+            students=students[index],
+            total=total,
+            absence_rate=absence_rate(statuses[index][ABSENT], total),
+            late_rate=absence_rate(statuses[index][LATE], total),
+            chronic_students=chronic[index],
+            chronic_share=round(chronic[index] / students[index], 4) if students[index] else None,
+            months=[
+                {
+                    'month': f'{1970 + month // 12}-{month % 12 + 1:02d}',
+                    'total': month_total[index][position],
+                    'absence_rate': absence_rate(month_absent[index][position], month_total[index][position])
+                }
+                for position, month in enumerate(months) if month_total[index][position]
+            ]
+        ))
+    return result
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, session
+from src.models.user import User, db
+from src.models.collection_version import CollectionVersion
+
+AUTH_CACHE_SIZE = 1024
+AUTH_CACHE_TTL = 60  # segundos
+
+
+class SessionUser:
+    # Cópia somente leitura dos campos do usuário usados pelas rotas; não fica
+    # presa a uma sessão do SQLAlchemy e pode ser compartilhada entre requisições
+    __slots__ = ('id', 'username', 'role', 'is_active')
+
+    def __init__(self, id, username, role, is_active):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.is_active = is_active
+
+    @classmethod
+    def from_model(cls, user):
+        return cls(user.id, user.username, user.role, user.is_active)
+
+    def __repr__(self):
+        return f'<SessionUser {self.username}>'
+
+
+class UserCache:
+    # Cache LRU limitado com expiração por tempo, por processo. Cada entrada
+    # guarda a versão da coleção 'users' (collection_versions) com que foi
+    # lida: criar, alterar ou excluir um usuário em qualquer processo
+    # incrementa a versão no banco compartilhado e descarta as entradas
+    # antigas de todos os processos na requisição seguinte
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id, version):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic() and entry[1] == version:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def set(self, user, version, ttl=AUTH_CACHE_TTL, max_size=AUTH_CACHE_SIZE):
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + ttl, version, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def user_cache():
+    # Um cache por aplicação, para que apps distintas no mesmo processo não
+    # compartilhem usuários
+    return current_app.extensions.setdefault('user_cache', UserCache())
+
+
+def users_version():
+    # Uma leitura pela chave primária, em vez de carregar o usuário
+    return db.session.query(CollectionVersion.version).filter_by(name='users').scalar() or 0
+
+
+def remember_user(user, version=None):
+    session_user = SessionUser.from_model(user)
+    user_cache().set(
+        session_user,
+        users_version() if version is None else version,
+        ttl=current_app.config.get('AUTH_CACHE_TTL', AUTH_CACHE_TTL),
+        max_size=current_app.config.get('AUTH_CACHE_SIZE', AUTH_CACHE_SIZE)
+    )
+    return session_user
+
+
+def require_auth():
+    user_id = session.get('user_id')
+    if not user_id:
+        return None
+    version = users_version()
+    user = user_cache().get(user_id, version)
+    if user is None:
+        model = User.query.get(user_id)
+        if not model:
+            return None
+        user = remember_user(model, version)
+    return user
+
+
+def require_admin():
+    user = require_auth()
+    if not user or user.role != 'admin':
+        return None
+    return user
@@ -0,0 +1,134 @@
+import os
+
+import click
+from sqlalchemy.exc import IntegrityError
+from src.models.user import User, db
+from src.models.school import School
+from src.models.class_model import Class
+from src.models.attendance_summary import rebuild_summaries
+from src.models.absence_state import rebuild_absence_states, verify_absence_states
+from src.migrations import DuplicateRowsError, upgrade_database
+from src.partitions import ArchivedYearError, archive_year
+from src.static_assets import STATIC_COMPRESS_MIN_SIZE, precompress_static
+
+
+def init_database(dedupe=False):
+    # Cria o diretório do SQLite, as tabelas e aplica os índices pendentes
+    url = db.engine.url
+    if url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:'):
+        os.makedirs(os.path.dirname(os.path.abspath(url.database)), exist_ok=True)
+    db.create_all()
+    upgrade_database(dedupe)
+
+
+def seed_database():
+    # Idempotente: pode ser executado a cada deploy sem duplicar registros
+    
+    # Criar usuário administrador padrão se não existir
+    if not User.query.filter_by(username='admin').first():
+        admin = User(username='admin', role='admin')
+        admin.set_password('admin123')
+        db.session.add(admin)
+    
+    # Criar usuário professor padrão se não existir
+    if not User.query.filter_by(username='professor').first():
+        professor = User(username='professor', role='teacher')
+        professor.set_password('prof123')
+        db.session.add(professor)
+    
+    # Criar escola padrão se não existir
+    if not School.query.first():
+        db.session.add(School(
+            name='Escola Exemplo',
+            address='Rua das Flores, 123',
+            phone='(11) 1234-5678',
+            email='contato@escolaexemplo.com.br'
+        ))
+    
+    # Criar turma padrão se não existir
+    if not Class.query.first():
+        db.session.add(Class(
+            name='Turma A',
+            grade='5º Ano',
+            year=2024,
+            teacher='Professor Exemplo',
+            description='Turma do 5º ano do ensino fundamental',
+            school_id=1
+        ))
+    
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Outro processo criou os mesmos usuários ao mesmo tempo
+        db.session.rollback()
+
+
+def register_commands(app):
+    #   flask --app src.main init-db [--dedupe]
+    # Com --dedupe, registros duplicados que impedem um índice único são
+    # exportados para CSV no diretório atual e removidos (fica o mais recente)
+    @app.cli.command('init-db')
+    @click.option('--dedupe', is_flag=True, help='Remove duplicados que impedem índices únicos')
+    def init_db_command(dedupe):
+        try:
+            init_database(dedupe)
+        except DuplicateRowsError as e:
+            for group in e.groups[:20]:
+                *values, count = group
+                click.echo(f'{e.table} {dict(zip(e.columns, values))}: {count} registros', err=True)
+            raise click.ClickException(str(e))
+        click.echo('Banco de dados inicializado')
+
+    #   flask --app src.main seed
+    @app.cli.command('seed')
+    def seed_command():
+        seed_database()
+        click.echo('Dados iniciais criados')
+
+    # Recalcular os resumos de frequência a partir do histórico:
+    #   flask --app src.main rebuild-summaries
+    @app.cli.command('rebuild-summaries')
+    def rebuild_summaries_command():
+        rebuild_summaries()
+        click.echo('Resumos de frequência recalculados')
+
+    # Recalcular os estados de faltas (alertas) do zero, ou apenas conferir se
+    # os estados mantidos a cada gravação batem com o recálculo:
+    #   flask --app src.main rebuild-absence-states [--verify]
+    @app.cli.command('rebuild-absence-states')
+    @click.option('--verify', is_flag=True, help='Apenas compara com o recálculo, sem gravar')
+    def rebuild_absence_states_command(verify):
+        if not verify:
+            rebuilt = rebuild_absence_states()
+            click.echo(f'Estados de faltas recalculados: {rebuilt} estudantes')
+            return
+        differences = verify_absence_states()
+        for student_id, stored, expected in differences[:20]:
+            click.echo(f'estudante {student_id}: gravado {stored}, esperado {expected}')
+        if differences:
+            raise click.ClickException(f'{len(differences)} estados divergentes')
+        click.echo('Estados de faltas conferidos: nenhuma divergência')
+
+    # Gravar as variantes .gz/.br do frontend depois do build:
+    #   flask --app src.main compress-static
+    @app.cli.command('compress-static')
+    def compress_static_command():
+        written = precompress_static(app.static_folder, app.config.get('STATIC_COMPRESS_MIN_SIZE', STATIC_COMPRESS_MIN_SIZE))
+        click.echo(f'{written} arquivos comprimidos gravados')
+
+    # Mover anos letivos encerrados para arquivos somente leitura:
+    #   flask --app src.main archive-year 2019 2020 --vacuum
+    @app.cli.command('archive-year')
+    @click.argument('years', nargs=-1, type=int, required=True)
+    @click.option('--vacuum', is_flag=True, help='Compacta o banco principal depois de arquivar')
+    def archive_year_command(years, vacuum):
+        for year in sorted(years):
+            try:
+                rows = archive_year(year)
+            except ArchivedYearError as e:
+                raise click.ClickException(str(e))
+            click.echo(f'Ano letivo {year} arquivado: {rows} frequências')
+        if vacuum and db.engine.url.get_backend_name() == 'sqlite':
+            with db.engine.connect() as connection:
+                connection.exec_driver_sql('VACUUM')
+            click.echo('Banco de dados compactado')
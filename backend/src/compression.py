@@ -0,0 +1,147 @@
+import zlib
+
+from flask import current_app, request
+
+# brotli e zstandard são opcionais: cada codificação só é oferecida quando a
+# biblioteca correspondente está instalada; gzip usa o zlib da biblioteca padrão
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Configuração:
+#   COMPRESSION_ENABLED   comprime as respostas da API
+#   COMPRESSION_MIN_SIZE  respostas menores (em bytes) seguem sem compressão
+#   COMPRESSION_LEVELS    nível por codificação; níveis altos trocam CPU por bytes
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_LEVELS = {'zstd': 3, 'br': 4, 'gzip': 6}
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/csv', 'text/plain')
+# Ordem de preferência quando o cliente aceita várias
+ENCODINGS = ('zstd', 'br', 'gzip')
+
+
+def available_encodings():
+    return [
+        encoding for encoding in ENCODINGS
+        if encoding == 'gzip' or (encoding == 'br' and brotli) or (encoding == 'zstd' and zstandard)
+    ]
+
+
+def negotiated_etag(etag):
+    # ETag da representação que esta requisição recebe: marcado com a
+    # codificação negociada (mesmo quando o corpo é pequeno demais para ser
+    # comprimido), para que o 304 e a comparação com If-None-Match usem o
+    # mesmo validador do 200
+    if not current_app.config.get('COMPRESSION_ENABLED'):
+        return etag
+    encoding = negotiate(available_encodings())
+    return f'{etag}-{encoding}' if encoding else etag
+
+
+class StreamCompressor:
+    # Interface comum aos três compressores: compress() devolve o bloco
+    # já descarregado (o cliente recebe cada parte sem esperar o fim) e
+    # finish() fecha o fluxo
+    def __init__(self, encoding, level):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=level)
+        elif encoding == 'zstd':
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        if self.encoding == 'br':
+            return self._compressor.process(data) + self._compressor.flush()
+        if self.encoding == 'zstd':
+            return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks, encoding, level):
+    compressor = StreamCompressor(encoding, level)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield compressor.compress(chunk)
+        yield compressor.finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close:
+            close()
+
+
+def negotiate(encodings):
+    accepted = request.accept_encodings
+    for encoding in encodings:
+        if accepted[encoding]:
+            return encoding
+    return None
+
+
+def configure_compression(app):
+    app.config.setdefault('COMPRESSION_ENABLED', True)
+    app.config.setdefault('COMPRESSION_MIN_SIZE', COMPRESSION_MIN_SIZE)
+    app.config.setdefault('COMPRESSION_LEVELS', COMPRESSION_LEVELS)
+    if not app.config['COMPRESSION_ENABLED']:
+        return
+
+    min_size = app.config['COMPRESSION_MIN_SIZE']
+    levels = dict(COMPRESSION_LEVELS, **app.config['COMPRESSION_LEVELS'])
+    encodings = available_encodings()
+
+    @app.after_request
+    def compress_response(response):
+        # Arquivos (send_file), respostas já codificadas (frontend
+        # pré-comprimido), parciais e sem corpo seguem como estão
+        if (response.mimetype not in COMPRESSIBLE_TYPES
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or request.method == 'HEAD'
+                or 'no-transform' in response.headers.get('Cache-Control', '')):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate(encodings)
+        if encoding is None:
+            return response
+        # O ETag identifica a representação negociada (ver negotiated_etag)
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f'{etag}-{encoding}', weak)
+
+        if response.is_streamed:
+            # Exportações: cada bloco é comprimido e enviado à medida que é gerado
+            response.response = compress_stream(response.response, encoding, levels[encoding])
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            response.set_data(compress(data, encoding, levels[encoding]))
+
+        response.headers['Content-Encoding'] = encoding
+        return response
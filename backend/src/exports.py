@@ -0,0 +1,63 @@
+import csv
+import io
+from datetime import datetime
+
+from sqlalchemy import select
+from src.models.user import db
+from src.models.attendance import Attendance
+from src.serialization import dumps, row_encoder, serialize_value
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+EXPORT_COLUMNS = ('id', 'student_id', 'class_id', 'date', 'status', 'notes', 'recorded_by', 'created_at')
+EXPORT_ATTRIBUTES = [getattr(Attendance, column) for column in EXPORT_COLUMNS]
+EXPORT_BATCH_SIZE = 2000
+
+
+def parse_export_dates(date_from=None, date_to=None):
+    return (
+        datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None,
+        datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None
+    )
+
+
+def attendance_export_query(class_id=None, date_from=None, date_to=None):
+    date_from, date_to = parse_export_dates(date_from, date_to)
+    query = select(*EXPORT_ATTRIBUTES)
+    if class_id:
+        query = query.where(Attendance.class_id == int(class_id))
+    if date_from:
+        query = query.where(Attendance.date >= date_from)
+    if date_to:
+        query = query.where(Attendance.date <= date_to)
+    return query.order_by(Attendance.id)
+
+
+def iter_partitions(query, batch_size, archives=()):
+    # Anos arquivados primeiro (em ordem), depois a tabela principal
+    for engine in archives:
+        with engine.connect() as connection:
+            yield from connection.execute(query.execution_options(yield_per=batch_size)).partitions()
+    yield from db.session.execute(query.execution_options(yield_per=batch_size)).partitions()
+
+
+def iter_export(query, export_format, batch_size=EXPORT_BATCH_SIZE, archives=()):
+    # Lê o resultado em lotes (yield_per) e produz um bloco de texto por lote,
+    # mantendo a memória constante independentemente do período exportado
+    encode = row_encoder(EXPORT_ATTRIBUTES)
+    if export_format == 'csv':
+        yield ','.join(EXPORT_COLUMNS) + '\r\n'
+    for rows in iter_partitions(query, batch_size, archives):
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows([serialize_value(value) for value in row] for row in rows)
+            yield buffer.getvalue()
+        else:
+            yield ''.join(_text(dumps(encode(row))) + '\n' for row in rows)
+
+
+def _text(value):
+    # orjson devolve bytes; o json da biblioteca padrão devolve str
+    return value.decode('utf-8') if isinstance(value, bytes) else value
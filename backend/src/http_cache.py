@@ -0,0 +1,47 @@
+import hashlib
+from datetime import datetime
+
+from flask import make_response, request
+from src.models.collection_version import CollectionVersion
+from src.compression import negotiated_etag
+
+
+class CollectionStamp:
+    # Validadores HTTP (ETag forte e Last-Modified) de uma listagem, derivados
+    # das versões das coleções envolvidas e dos parâmetros da requisição
+    def __init__(self, *names):
+        versions = {row.name: row for row in CollectionVersion.query.filter(CollectionVersion.name.in_(names))}
+        key = ';'.join(
+            f'{name}={versions[name].version if name in versions else 0}' for name in names
+        ) + ';' + request.full_path
+        self.etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        # Last-Modified tem resolução de segundos: se a coleção mudou no segundo
+        # corrente, outra alteração ainda neste segundo teria o mesmo valor e um
+        # If-Modified-Since receberia um 304 desatualizado; só o ETag vale então
+        modified = [row.updated_at.replace(microsecond=0) for row in versions.values()]
+        self.last_modified = max(modified) if modified else None
+        if self.last_modified and self.last_modified >= datetime.utcnow().replace(microsecond=0):
+            self.last_modified = None
+
+    def is_fresh(self):
+        if request.if_none_match:
+            return request.if_none_match.contains(negotiated_etag(self.etag))
+        if request.if_modified_since and self.last_modified:
+            return self.last_modified <= request.if_modified_since.replace(tzinfo=None)
+        return False
+
+    def apply(self, response):
+        response.set_etag(self.etag)
+        if self.last_modified:
+            response.last_modified = self.last_modified
+        # O navegador pode guardar a resposta, mas deve revalidar sempre
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def not_modified(self):
+        # A resposta 304 não passa pela compressão: leva o ETag da
+        # representação negociada, o mesmo do 200 correspondente
+        response = self.apply(make_response('', 304))
+        response.set_etag(negotiated_etag(self.etag))
+        response.vary.add('Accept-Encoding')
+        return response
@@ -0,0 +1,178 @@
+import csv
+import io
+import os
+import uuid
+from datetime import date
+
+from flask import current_app, json
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from src.models.user import db
+from src.models.class_model import Class
+from src.models.student import Student
+from src.models.collection_version import CollectionVersion
+from src.jobs import JOBS_RESULT_DIR, job_type
+
+# Configuração:
+#   IMPORT_CHUNK_SIZE  linhas validadas e inseridas por transação
+#   IMPORT_MAX_ERRORS  erros por linha devolvidos no relatório (os demais só são contados)
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_ERRORS = 1000
+IMPORT_COLUMNS = ('student_id', 'name', 'email', 'phone', 'address', 'birth_date', 'parent_name', 'parent_phone', 'class_id')
+IMPORT_REQUIRED = ('student_id', 'name', 'email', 'class_id')
+
+
+class StudentImportError(ValueError):
+    pass
+
+
+class StudentImport:
+    # Importação em lotes: cada lote de linhas válidas tem a unicidade de
+    # student_id verificada com uma única consulta IN e é inserido com um
+    # executemany na mesma transação
+    def __init__(self, chunk_size=IMPORT_CHUNK_SIZE, max_errors=IMPORT_MAX_ERRORS):
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+        self._seen = set()
+        self._class_ids = set(db.session.execute(select(Class.id)).scalars())
+
+    def run(self, text_stream, progress=None):
+        reader = csv.DictReader(text_stream)
+        missing = [column for column in IMPORT_REQUIRED if column not in (reader.fieldnames or ())]
+        if missing:
+            raise StudentImportError(f'Colunas obrigatórias ausentes: {", ".join(missing)}')
+
+        chunk = []
+        # A linha 1 é o cabeçalho
+        for line, row in enumerate(reader, start=2):
+            values = self.parse_row(line, row)
+            if values is not None:
+                chunk.append((line, values))
+            if len(chunk) >= self.chunk_size:
+                self.insert_chunk(chunk)
+                chunk = []
+                if progress:
+                    progress()
+        if chunk:
+            self.insert_chunk(chunk)
+        return self.report()
+
+    def parse_row(self, line, row):
+        values = {column: (row.get(column) or '').strip() or None for column in IMPORT_COLUMNS}
+        missing = [column for column in IMPORT_REQUIRED if not values[column]]
+        if missing:
+            return self.error(line, values['student_id'], f'Campos obrigatórios vazios: {", ".join(missing)}')
+
+        try:
+            values['class_id'] = int(values['class_id'])
+        except ValueError:
+            return self.error(line, values['student_id'], 'class_id deve ser um número inteiro')
+        if values['class_id'] not in self._class_ids:
+            return self.error(line, values['student_id'], 'Turma não encontrada')
+
+        if values['birth_date']:
+            try:
+                values['birth_date'] = date.fromisoformat(values['birth_date'])
+            except ValueError:
+                return self.error(line, values['student_id'], 'birth_date deve estar no formato AAAA-MM-DD')
+
+        if len(values['student_id']) > Student.student_id.type.length:
+            return self.error(line, values['student_id'], 'student_id muito longo')
+        if values['student_id'] in self._seen:
+            return self.error(line, values['student_id'], 'ID do estudante repetido no arquivo')
+        self._seen.add(values['student_id'])
+        return values
+
+    def insert_chunk(self, chunk, retry=True):
+        existing = set(db.session.execute(
+            select(Student.student_id).where(Student.student_id.in_([values['student_id'] for _, values in chunk]))
+        ).scalars())
+        rows = []
+        for line, values in chunk:
+            if values['student_id'] in existing:
+                self.error(line, values['student_id'], 'ID do estudante já existe')
+            else:
+                rows.append(values)
+        if not rows:
+            return
+
+        try:
+            db.session.execute(Student.__table__.insert(), rows)
+            CollectionVersion.bump('students')
+            db.session.commit()
+        except IntegrityError:
+            # Outro processo cadastrou algum destes IDs entre a verificação e
+            # a inserção: refaz o lote uma vez com a lista atualizada
+            db.session.rollback()
+            if not retry:
+                raise
+            return self.insert_chunk([(line, values) for line, values in chunk if values['student_id'] not in existing], retry=False)
+        self.imported += len(rows)
+
+    def error(self, line, student_id, message):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'student_id': student_id, 'error': message})
+        return None
+
+    def report(self):
+        return {
+            'imported': self.imported,
+            'error_count': self.error_count,
+            'errors': self.errors
+        }
+
+
+def import_students(text_stream, config, progress=None):
+    return StudentImport(
+        config.get('IMPORT_CHUNK_SIZE', IMPORT_CHUNK_SIZE),
+        config.get('IMPORT_MAX_ERRORS', IMPORT_MAX_ERRORS)
+    ).run(text_stream, progress)
+
+
+def text_stream(binary_stream):
+    # utf-8-sig aceita o BOM que planilhas costumam gravar
+    return io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+
+
+def upload_dir(config):
+    return os.path.join(config.get('JOBS_RESULT_DIR', JOBS_RESULT_DIR), 'uploads')
+
+
+def save_upload(binary_stream, config):
+    # Grava o CSV para que a tarefa em segundo plano o leia depois da resposta
+    os.makedirs(upload_dir(config), exist_ok=True)
+    name = f'{uuid.uuid4()}.csv'
+    with open(os.path.join(upload_dir(config), name), 'wb') as output:
+        while True:
+            block = binary_stream.read(1024 * 1024)
+            if not block:
+                break
+            output.write(block)
+    return name
+
+
+@job_type('student_import', admin_only=True)
+def import_students_job(context):
+    # Só arquivos enviados por /api/students/import?async=true
+    path = os.path.join(upload_dir(current_app.config), os.path.basename(context.params.get('upload', '')))
+    if not context.params.get('upload') or not os.path.isfile(path):
+        raise ValueError('Arquivo de importação não encontrado')
+
+    size = os.path.getsize(path) or 1
+    try:
+        with open(path, 'rb') as upload:
+            report = import_students(
+                text_stream(upload),
+                current_app.config,
+                progress=lambda: context.progress(upload.tell() / size)
+            )
+    finally:
+        os.remove(path)
+
+    with open(context.result_file('json', 'application/json'), 'w', encoding='utf-8') as output:
+        json.dump(report, output)
+    return f'{report["imported"]} estudantes importados, {report["error_count"]} linhas com erro'
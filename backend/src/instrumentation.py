@@ -0,0 +1,200 @@
+import logging
+import threading
+import time
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from src.models.user import db
+
+# Configuração:
+#   METRICS_ENABLED     coleta as métricas e adiciona o cabeçalho Server-Timing
+#   METRICS_TOKEN       /metrics exige "Authorization: Bearer <token>"; sem
+#                       token definido, /metrics é negado
+#   METRICS_ALLOW_LOCAL dispensa o token para conexões diretas do próprio
+#                       servidor (loopback, sem X-Forwarded-For). Desligado:
+#                       atrás de um proxy local todo acesso parece local
+#   SLOW_QUERY_MS       registra no log os comandos SQL mais lentos que este
+#                       limite, com o plano de execução (desligado por padrão)
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetrics:
+    # Histogramas de latência e totais de SQL e bytes por
+    # (método, rota, status), no formato de texto do Prometheus
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method, endpoint, status, seconds, sql_count, sql_seconds, size):
+        key = (method, endpoint, status)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'buckets': [0] * len(self.buckets),
+                    'count': 0,
+                    'seconds': 0.0,
+                    'sql_count': 0,
+                    'sql_seconds': 0.0,
+                    'size': 0
+                }
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series['buckets'][index] += 1
+            series['count'] += 1
+            series['seconds'] += seconds
+            series['sql_count'] += sql_count
+            series['sql_seconds'] += sql_seconds
+            series['size'] += size
+
+    def render(self):
+        with self._lock:
+            series = {key: dict(value, buckets=list(value['buckets'])) for key, value in self._series.items()}
+
+        lines = [
+            '# HELP http_request_duration_seconds Latência das requisições',
+            '# TYPE http_request_duration_seconds histogram'
+        ]
+        for key, value in sorted(series.items()):
+            labels = _labels(key)
+            for bound, count in zip(self.buckets, value['buckets']):
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {value["count"]}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {value["seconds"]:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {value["count"]}')
+
+        for name, field, kind, description in (
+            ('http_request_sql_statements_total', 'sql_count', 'counter', 'Comandos SQL executados'),
+            ('http_request_sql_seconds_total', 'sql_seconds', 'counter', 'Tempo gasto em comandos SQL'),
+            ('http_response_size_bytes_total', 'size', 'counter', 'Bytes enviados no corpo das respostas')
+        ):
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            for key, value in sorted(series.items()):
+                lines.append(f'{name}{{{_labels(key)}}} {_number(value[field])}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(key):
+    method, endpoint, status = key
+    endpoint = endpoint.replace('\\', '\\\\').replace('"', '\\"')
+    return f'method="{method}",endpoint="{endpoint}",status="{status}"'
+
+
+def _number(value):
+    return f'{value:.6f}' if isinstance(value, float) else str(value)
+
+
+def explain(connection, statement, parameters):
+    # Plano de execução do comando lento, em um cursor próprio da mesma conexão.
+    # No PostgreSQL um EXPLAIN com erro abortaria a transação da requisição:
+    # roda dentro de um SAVEPOINT
+    sqlite = connection.dialect.name == 'sqlite'
+    prefix = 'EXPLAIN QUERY PLAN ' if sqlite else 'EXPLAIN '
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        if not sqlite:
+            cursor.execute('SAVEPOINT slow_query_plan')
+        try:
+            cursor.execute(prefix + statement, parameters)
+            plan = '\n'.join('  ' + ' | '.join(str(value) for value in row) for row in cursor.fetchall())
+        except Exception:
+            if not sqlite:
+                cursor.execute('ROLLBACK TO SAVEPOINT slow_query_plan')
+            raise
+        finally:
+            if not sqlite:
+                cursor.execute('RELEASE SAVEPOINT slow_query_plan')
+        return plan
+    finally:
+        cursor.close()
+
+
+def explainable(statement):
+    # Só consultas: DDL e escritas não têm plano útil (e o EXPLAIN de um
+    # CREATE falharia com "already exists")
+    return statement.lstrip().upper().startswith(('SELECT', 'WITH'))
+
+
+def configure_instrumentation(app):
+    app.config.setdefault('METRICS_ENABLED', True)
+    app.config.setdefault('METRICS_TOKEN', None)
+    app.config.setdefault('METRICS_ALLOW_LOCAL', False)
+    app.config.setdefault('SLOW_QUERY_MS', None)
+    if not app.config['METRICS_ENABLED'] and not app.config['SLOW_QUERY_MS']:
+        return
+
+    slow_query_seconds = app.config['SLOW_QUERY_MS'] / 1000 if app.config['SLOW_QUERY_MS'] else None
+
+    with app.app_context():
+        engine = db.engine
+
+    # O início fica no contexto de execução do próprio comando: um comando que
+    # falha não deixa nada para trás na conexão
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def end_query(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_query_start', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if has_request_context() and 'request_start' in g:
+            g.sql_count += 1
+            g.sql_seconds += elapsed
+        if slow_query_seconds is not None and elapsed >= slow_query_seconds and not executemany:
+            if not explainable(statement):
+                plan = '  (não é uma consulta)'
+            else:
+                try:
+                    plan = explain(conn, statement, parameters)
+                except Exception as e:
+                    plan = f'  (plano indisponível: {e})'
+            logger.warning('Consulta lenta (%.1f ms): %s\nparâmetros: %r\nplano:\n%s',
+                           elapsed * 1000, statement, parameters, plan)
+
+    if not app.config['METRICS_ENABLED']:
+        return
+    metrics = app.extensions['metrics'] = RequestMetrics()
+
+    @app.before_request
+    def start_request():
+        g.request_start = time.perf_counter()
+        g.sql_count = 0
+        g.sql_seconds = 0.0
+
+    @app.after_request
+    def record_request(response):
+        if 'request_start' not in g:
+            return response
+        # Em respostas em fluxo (exportações) o tempo vai até o início do envio
+        # e o tamanho não é contado: calculá-lo leria o fluxo inteiro para a memória
+        elapsed = time.perf_counter() - g.request_start
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        size = 0 if response.is_streamed else response.calculate_content_length() or 0
+        metrics.observe(
+            request.method, endpoint, response.status_code,
+            elapsed, g.sql_count, g.sql_seconds, size
+        )
+        response.headers.add(
+            'Server-Timing',
+            f'app;dur={elapsed * 1000:.1f}, db;dur={g.sql_seconds * 1000:.1f};desc="{g.sql_count} queries"'
+        )
+        return response
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        token = current_app.config['METRICS_TOKEN']
+        allowed = bool(token) and request.headers.get('Authorization') == f'Bearer {token}'
+        if not allowed and current_app.config['METRICS_ALLOW_LOCAL']:
+            allowed = request.remote_addr in LOCAL_ADDRESSES and 'X-Forwarded-For' not in request.headers
+        if not allowed:
+            return Response('Acesso negado\n', status=403, mimetype='text/plain')
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
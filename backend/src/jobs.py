@@ -0,0 +1,340 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, inspect, select
+from src.models.user import db
+from src.models.job import Job
+from src.models.attendance_summary import rebuild_summaries
+from src.models.absence_state import rebuild_absence_states, verify_absence_states
+from src.exports import EXPORT_FORMATS, attendance_export_query, iter_export, parse_export_dates
+from src.partitions import archive_engines
+
+# Configuração:
+#   JOBS_WORKERS         threads que executam tarefas em segundo plano por processo
+#   JOBS_RESULT_DIR      diretório dos arquivos gerados pelas tarefas
+#   JOBS_AUTOSTART       inicia a thread de manutenção (reenvio da fila,
+#                        tarefas órfãs, limpeza de arquivos) na primeira
+#                        requisição atendida ou tarefa enviada pelo processo
+#   JOBS_HEARTBEAT_INTERVAL  intervalo (s) em que o processo registra que
+#                        continua executando as suas tarefas
+#   JOBS_STALE_AFTER     segundos sem esse registro a partir dos quais uma
+#                        tarefa 'running' é considerada interrompida
+#   JOBS_RETENTION_DAYS  dias que os arquivos de resultado e uploads são mantidos
+#   JOBS_SWEEP_INTERVAL  intervalo (s) entre as rodadas de manutenção
+JOBS_WORKERS = 2
+JOBS_RESULT_DIR = os.path.join(os.path.dirname(__file__), 'database', 'jobs')
+JOBS_HEARTBEAT_INTERVAL = 30
+JOBS_STALE_AFTER = 600
+JOBS_RETENTION_DAYS = 7
+JOBS_SWEEP_INTERVAL = 600
+
+logger = logging.getLogger(__name__)
+
+# Tipos de tarefa registrados: nome -> (função, somente administradores)
+JOB_TYPES = {}
+
+
+def job_type(name, admin_only=False):
+    def decorator(handler):
+        JOB_TYPES[name] = (handler, admin_only)
+        return handler
+    return decorator
+
+
+class JobContext:
+    # Passado para a função da tarefa: parâmetros, progresso e arquivo de resultado
+    def __init__(self, job, result_dir):
+        self.job_id = job.id
+        self.params = json.loads(job.params) if job.params else {}
+        self.result_dir = result_dir
+        self.result_path = None
+        self.result_mimetype = None
+        self._last_progress = (0.0, time.monotonic())
+
+    def progress(self, fraction):
+        # Grava no máximo uma atualização por segundo ou a cada 5%, em uma
+        # conexão própria para não interferir na transação da tarefa
+        fraction = max(0.0, min(1.0, fraction))
+        last_fraction, last_time = self._last_progress
+        if fraction - last_fraction < 0.05 and time.monotonic() - last_time < 1:
+            return
+        self._last_progress = (fraction, time.monotonic())
+        with db.engine.begin() as connection:
+            connection.execute(
+                Job.__table__.update().where(Job.__table__.c.id == self.job_id).values(progress=fraction)
+            )
+
+    def result_file(self, extension, mimetype):
+        os.makedirs(self.result_dir, exist_ok=True)
+        self.result_path = os.path.join(self.result_dir, f'{self.job_id}.{extension}')
+        self.result_mimetype = mimetype
+        return self.result_path
+
+
+class JobRunner:
+    # Pool de threads do processo; o estado das tarefas fica no banco
+    def __init__(self, app, workers):
+        self.app = app
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._running = set()
+        self._heartbeat = None
+        self._lock = threading.Lock()
+
+    def submit(self, job_id):
+        with self._lock:
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._beat, name='job-heartbeat', daemon=True)
+                self._heartbeat.start()
+        self._executor.submit(self._run, job_id)
+
+    def _beat(self):
+        # Enquanto o processo executa uma tarefa, renova heartbeat_at: uma
+        # tarefa longa não é confundida com a de um processo encerrado
+        interval = self.app.config.get('JOBS_HEARTBEAT_INTERVAL', JOBS_HEARTBEAT_INTERVAL)
+        table = Job.__table__
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                running = list(self._running)
+            if not running:
+                continue
+            try:
+                with self.app.app_context(), db.engine.begin() as connection:
+                    connection.execute(
+                        table.update()
+                        .where(table.c.id.in_(running), table.c.status == 'running')
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+            except Exception:
+                logger.exception('Não foi possível registrar a atividade das tarefas')
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            # Reivindica a tarefa de forma atômica: se outro processo já a
+            # iniciou, nada a fazer
+            now = datetime.utcnow()
+            claimed = Job.query.filter_by(id=job_id, status='queued').update(
+                {'status': 'running', 'started_at': now, 'heartbeat_at': now},
+                synchronize_session=False
+            )
+            db.session.commit()
+            if not claimed:
+                return
+            with self._lock:
+                self._running.add(job_id)
+
+            # Daqui em diante qualquer erro (parâmetros inválidos, tipo
+            # desconhecido, falha da tarefa) termina como 'failed', nunca
+            # deixa a tarefa presa em 'running'
+            context = None
+            try:
+                job = db.session.get(Job, job_id)
+                context = JobContext(job, self.app.config.get('JOBS_RESULT_DIR', JOBS_RESULT_DIR))
+                handler = JOB_TYPES[job.type][0]
+                message = handler(context)
+                status = 'succeeded'
+            except Exception as e:
+                db.session.rollback()
+                logger.exception('Tarefa %s falhou', job_id)
+                message = str(e) or e.__class__.__name__
+                status = 'failed'
+
+            try:
+                finish_job(job_id, status, message, context if status == 'succeeded' else None)
+            except Exception:
+                db.session.rollback()
+                logger.exception('Não foi possível gravar o fim da tarefa %s', job_id)
+            finally:
+                with self._lock:
+                    self._running.discard(job_id)
+
+
+def finish_job(job_id, status, message, context=None):
+    job = db.session.get(Job, job_id)
+    job.status = status
+    job.message = message
+    job.finished_at = datetime.utcnow()
+    if context is not None:
+        job.progress = 1.0
+        job.result_path = context.result_path
+        job.result_mimetype = context.result_mimetype
+    db.session.commit()
+
+
+def fail_stale_jobs(stale_after):
+    # Tarefas 'running' cujo processo não renova heartbeat_at há mais de
+    # stale_after segundos ficaram órfãs de um processo encerrado no meio da
+    # execução: são marcadas como falhas (refazer uma importação pela metade
+    # não é seguro). Tarefas longas de processos ativos continuam em execução
+    interrupted = Job.query.filter(
+        Job.status == 'running',
+        func.coalesce(Job.heartbeat_at, Job.started_at) < datetime.utcnow() - timedelta(seconds=stale_after)
+    ).update({
+        'status': 'failed',
+        'message': 'Tarefa interrompida: o processo foi encerrado durante a execução',
+        'finished_at': datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+    return interrupted
+
+
+def resubmit_queued_jobs(runner):
+    # Tarefas enfileiradas por um processo que parou antes de executá-las; a
+    # reivindicação atômica impede que dois processos executem a mesma
+    queued = [job_id for (job_id,) in db.session.query(Job.id).filter_by(status='queued').order_by(Job.created_at)]
+    for job_id in queued:
+        runner.submit(job_id)
+    return len(queued)
+
+
+def sweep_job_files(result_dir, retention_days):
+    # Remove arquivos de resultado de tarefas terminadas há mais de
+    # retention_days dias e arquivos sem tarefa (uploads abandonados) tão antigos quanto
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    removed = 0
+    for job in Job.query.filter(Job.result_path.isnot(None), Job.finished_at < cutoff):
+        try:
+            os.remove(job.result_path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        job.result_path = None
+    db.session.commit()
+
+    referenced = {
+        os.path.abspath(path) for (path,) in db.session.query(Job.result_path).filter(Job.result_path.isnot(None))
+    }
+    for directory, _, names in os.walk(result_dir):
+        for name in names:
+            path = os.path.abspath(os.path.join(directory, name))
+            try:
+                if path not in referenced and datetime.utcfromtimestamp(os.path.getmtime(path)) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+_runner_lock = threading.Lock()
+
+
+def job_runner():
+    with _runner_lock:
+        if 'job_runner' not in current_app.extensions:
+            current_app.extensions['job_runner'] = JobRunner(
+                current_app._get_current_object(),
+                current_app.config.get('JOBS_WORKERS', JOBS_WORKERS)
+            )
+    start_job_maintenance(current_app._get_current_object())
+    return current_app.extensions['job_runner']
+
+
+def maintain_jobs(app):
+    # Thread de manutenção do processo: reenvia as tarefas da fila na primeira
+    # rodada; a cada rodada encerra as órfãs e limpa os arquivos antigos
+    resubmitted = False
+    while True:
+        try:
+            with app.app_context():
+                # Antes do init-db não há o que manter: aguarda em silêncio
+                if inspect(db.engine).has_table(Job.__tablename__):
+                    if not resubmitted:
+                        resubmit_queued_jobs(job_runner())
+                        resubmitted = True
+                    interrupted = fail_stale_jobs(app.config['JOBS_STALE_AFTER'])
+                    if interrupted:
+                        logger.warning('%d tarefas interrompidas marcadas como falhas', interrupted)
+                    removed = sweep_job_files(app.config.get('JOBS_RESULT_DIR', JOBS_RESULT_DIR), app.config['JOBS_RETENTION_DAYS'])
+                    if removed:
+                        logger.info('%d arquivos de tarefas antigos removidos', removed)
+        except Exception:
+            logger.exception('Manutenção das tarefas falhou')
+        time.sleep(app.config['JOBS_SWEEP_INTERVAL'] if resubmitted else 10)
+
+
+_maintenance_lock = threading.Lock()
+
+
+def start_job_maintenance(app):
+    # Uma thread por processo, iniciada só por quem atende requisições ou
+    # executa tarefas: importar a aplicação e os comandos do flask não a iniciam
+    if not app.config.get('JOBS_AUTOSTART', True) or 'job_maintenance' in app.extensions:
+        return
+    with _maintenance_lock:
+        if 'job_maintenance' in app.extensions:
+            return
+        app.extensions['job_maintenance'] = threading.Thread(
+            target=maintain_jobs, args=(app,), name='job-maintenance', daemon=True
+        )
+    app.extensions['job_maintenance'].start()
+
+
+def configure_jobs(app):
+    app.config.setdefault('JOBS_AUTOSTART', True)
+    app.config.setdefault('JOBS_HEARTBEAT_INTERVAL', JOBS_HEARTBEAT_INTERVAL)
+    app.config.setdefault('JOBS_STALE_AFTER', JOBS_STALE_AFTER)
+    app.config.setdefault('JOBS_RETENTION_DAYS', JOBS_RETENTION_DAYS)
+    app.config.setdefault('JOBS_SWEEP_INTERVAL', JOBS_SWEEP_INTERVAL)
+
+    @app.before_request
+    def start_jobs():
+        start_job_maintenance(current_app._get_current_object())
+
+
+def enqueue_job(type, params, user):
+    job = Job(type=type, params=json.dumps(params or {}), created_by=user.id)
+    db.session.add(job)
+    db.session.commit()
+    job_runner().submit(job.id)
+    return job
+
+
+@job_type('attendance_export')
+def export_attendances_job(context):
+    export_format = context.params.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError('Formato deve ser ndjson ou csv')
+    query = attendance_export_query(
+        class_id=context.params.get('class_id'),
+        date_from=context.params.get('from'),
+        date_to=context.params.get('to')
+    )
+    archives = archive_engines(*parse_export_dates(context.params.get('from'), context.params.get('to')))
+    count = select(func.count()).select_from(query.subquery())
+    total = db.session.execute(count).scalar()
+    for engine in archives:
+        with engine.connect() as connection:
+            total += connection.execute(count).scalar()
+
+    written = 0
+    with open(context.result_file(export_format, EXPORT_FORMATS[export_format]), 'w', encoding='utf-8', newline='') as output:
+        for chunk in iter_export(query, export_format, archives=archives):
+            output.write(chunk)
+            written += chunk.count('\n')
+            if total:
+                context.progress(written / total)
+    return f'{total} registros exportados'
+
+
+@job_type('rebuild_summaries', admin_only=True)
+def rebuild_summaries_job(context):
+    rebuild_summaries()
+    return 'Resumos de frequência recalculados'
+
+
+@job_type('rebuild_absence_states', admin_only=True)
+def rebuild_absence_states_job(context):
+    # {"verify": true} apenas confere os estados mantidos a cada gravação
+    if not context.params.get('verify'):
+        return f'Estados de faltas recalculados: {rebuild_absence_states()} estudantes'
+    differences = verify_absence_states()
+    if differences:
+        raise ValueError(f'{len(differences)} estados divergentes, ex. estudante {differences[0][0]}')
+    return 'Estados de faltas conferidos: nenhuma divergência'
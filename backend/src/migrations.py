@@ -0,0 +1,86 @@
+import csv
+import logging
+import os
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from src.models.user import db
+from src.models.student import Student
+from src.models.attendance import Attendance
+from src.models.absence_state import StudentAbsenceState, rebuild_absence_states
+from src.models.job import Job
+from src.search import create_search_index
+
+logger = logging.getLogger(__name__)
+
+
+class DuplicateRowsError(Exception):
+    # Registros repetidos impedem a criação de um índice único
+    def __init__(self, table, columns, groups):
+        self.table = table
+        self.columns = columns
+        self.groups = groups
+        super().__init__(
+            f'{len(groups)} grupos de registros duplicados em {table} ({", ".join(columns)}); '
+            f'resolva-os ou execute init-db --dedupe'
+        )
+
+
+def upgrade_database(dedupe=False, export_dir='.'):
+    # db.create_all() só cria tabelas novas; bancos app.db existentes precisam
+    # receber as colunas e os índices declarados depois da criação da tabela.
+    # Duplicados que impeçam um índice único só são removidos com dedupe=True,
+    # depois de exportados para export_dir
+    with db.engine.begin() as connection:
+        add_missing_columns(connection, Job.__table__)
+        for table in (Student.__table__, Attendance.__table__):
+            existing = {index['name'] for index in inspect(connection).get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if index.name in existing:
+                    continue
+                if index.unique:
+                    columns = [column.name for column in index.columns]
+                    groups = duplicate_groups(connection, table, columns)
+                    if groups and not dedupe:
+                        raise DuplicateRowsError(table.name, columns, groups)
+                    if groups:
+                        remove_duplicates(connection, table, columns, export_dir)
+                index.create(connection)
+        create_search_index(connection)
+
+    # Bancos que já tinham frequências antes dos estados de faltas
+    if not db.session.query(StudentAbsenceState.student_id).first() and db.session.query(Attendance.id).first():
+        rebuild_absence_states()
+
+
+def add_missing_columns(connection, table):
+    # Só colunas opcionais: as linhas existentes ficam com NULL
+    existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+    for column in table.columns:
+        if column.name not in existing and column.nullable:
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+
+def duplicate_groups(connection, table, columns):
+    # Valores repetidos das colunas do índice e quantos registros cada um tem
+    key = ', '.join(columns)
+    return connection.execute(text(
+        f'SELECT {key}, COUNT(*) FROM {table.name} GROUP BY {key} HAVING COUNT(*) > 1 ORDER BY {key}'
+    )).all()
+
+
+def remove_duplicates(connection, table, columns, export_dir):
+    # Mantém o registro mais recente de cada grupo; os removidos são gravados
+    # em CSV antes da exclusão
+    key = ', '.join(columns)
+    condition = f'id NOT IN (SELECT MAX(id) FROM {table.name} GROUP BY {key})'
+    rows = connection.execute(text(f'SELECT * FROM {table.name} WHERE {condition} ORDER BY {key}, id'))
+    path = os.path.join(export_dir, f'{table.name}-duplicados-{datetime.now():%Y%m%d%H%M%S}.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(rows.keys())
+        writer.writerows(rows)
+    removed = connection.execute(text(f'DELETE FROM {table.name} WHERE {condition}')).rowcount
+    logger.warning('%d registros duplicados removidos de %s; exportados para %s', removed, table.name, path)
+    return removed, path
@@ -0,0 +1,328 @@
+from src.models.user import db
+from src.models.attendance import Attendance
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm.attributes import flag_modified
+from datetime import date
+from itertools import groupby
+
+# Janela móvel de dias corridos terminando no último dia registrado do estudante
+WINDOW_DAYS = 30
+WINDOW_MASK = (1 << WINDOW_DAYS) - 1
+TERM_STATUSES = ('present', 'absent', 'late')
+
+# Limites padrão dos alertas (configuráveis pelas chaves ABSENCE_ALERT_*):
+# 5 faltas consecutivas ou 7 alternadas em 30 dias (notificação ao Conselho
+# Tutelar) e 25% ou mais de faltas no semestre (frequência mínima de 75% da LDB)
+ABSENCE_ALERT_STREAK = 5
+ABSENCE_ALERT_WINDOW_ABSENCES = 7
+ABSENCE_ALERT_TERM_RATE = 0.25
+ABSENCE_ALERT_TERM_MIN_DAYS = 20
+
+class StudentAbsenceState(db.Model):
+    __tablename__ = 'student_absence_state'
+
+    # Estado corrente de faltas do estudante no ano letivo do seu último
+    # registro, mantido a cada gravação de frequência: faltas consecutivas,
+    # os últimos 30 dias em máscaras de bits (bit 0 = last_date) e os totais
+    # do semestre de last_date
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), primary_key=True, autoincrement=False)
+    last_date = db.Column(db.Date, nullable=False, index=True)
+    streak = db.Column(db.Integer, nullable=False, default=0)
+    streak_start = db.Column(db.Date, nullable=True)
+    recorded_mask = db.Column(db.Integer, nullable=False, default=0)
+    absent_mask = db.Column(db.Integer, nullable=False, default=0)
+    window_recorded = db.Column(db.Integer, nullable=False, default=0)
+    window_absent = db.Column(db.Integer, nullable=False, default=0)
+    term_start = db.Column(db.Date, nullable=False)
+    term_present = db.Column(db.Integer, nullable=False, default=0)
+    term_absent = db.Column(db.Integer, nullable=False, default=0)
+    term_late = db.Column(db.Integer, nullable=False, default=0)
+
+    @property
+    def term_total(self):
+        return self.term_present + self.term_absent + self.term_late
+
+    def to_dict(self):
+        return {
+            'student_id': self.student_id,
+            'last_date': self.last_date.isoformat(),
+            'streak': self.streak,
+            'streak_start': self.streak_start.isoformat() if self.streak_start else None,
+            'window_days': WINDOW_DAYS,
+            'window_recorded': self.window_recorded,
+            'window_absent': self.window_absent,
+            'window_absence_rate': round(self.window_absent / self.window_recorded, 4) if self.window_recorded else 0.0,
+            'term_start': self.term_start.isoformat(),
+            'term_present': self.term_present,
+            'term_absent': self.term_absent,
+            'term_late': self.term_late,
+            'term_absence_rate': round(self.term_absent / self.term_total, 4) if self.term_total else 0.0
+        }
+
+    def __repr__(self):
+        return f'<StudentAbsenceState {self.student_id} - {self.last_date}>'
+
+STATE_FIELDS = (
+    'last_date', 'streak', 'streak_start', 'recorded_mask', 'absent_mask', 'window_recorded',
+    'window_absent', 'term_start', 'term_present', 'term_absent', 'term_late'
+)
+
+def term_start(day):
+    # Semestres letivos: janeiro a junho e julho a dezembro
+    return date(day.year, 1 if day.month <= 6 else 7, 1)
+
+def absence_change(attendance, previous, status):
+    # previous=None ao criar o registro, status=None ao removê-lo
+    return (int(attendance.student_id), attendance.date, previous, status)
+
+def update_absence_states(changes):
+    # Atualização incremental, na mesma transação da alteração da frequência.
+    # Lançar a chamada do dia (o caso comum) custa O(1) por estudante: desloca
+    # as máscaras e soma os contadores. Correções e exclusões que possam mudar
+    # a sequência de faltas ou o último dia releem apenas os registros recentes
+    # do estudante (janela e sequência atual), nunca o histórico inteiro
+    if not changes:
+        return
+    student_ids = {student_id for student_id, _, _, _ in changes}
+    states = {
+        state.student_id: state for state in StudentAbsenceState.query.filter(
+            StudentAbsenceState.student_id.in_(student_ids)
+        ).with_for_update()
+    }
+    created = {}
+    for student_id, day, previous, status in changes:
+        state = states.get(student_id)
+        if state is None:
+            state = states[student_id] = created[student_id] = StudentAbsenceState(student_id=student_id)
+        if not apply_change(state, day, previous, status) and not refresh_state(state):
+            # Nenhum registro restante na tabela principal
+            if student_id not in created:
+                db.session.delete(state)
+            del states[student_id]
+            created.pop(student_id, None)
+    # Mesmas colunas em todas as linhas: o flush agrupa as atualizações da
+    # chamada em um único executemany em vez de um comando por combinação
+    for state in states.values():
+        if state in db.session:
+            for field in STATE_FIELDS:
+                flag_modified(state, field)
+    insert_states(created.values(), changes)
+
+def insert_states(states, changes):
+    # Primeiro registro dos estudantes. O SQLite ignora o FOR UPDATE, e no
+    # PostgreSQL não há linha para bloquear: outra transação pode ter criado o
+    # mesmo estado depois da leitura. Sem colisão na chave primária: as
+    # alterações desta transação são aplicadas sobre o estado já gravado
+    rows = [dict({field: getattr(state, field) for field in STATE_FIELDS}, student_id=state.student_id) for state in states]
+    if not rows:
+        return
+    table = StudentAbsenceState.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect not in ('sqlite', 'postgresql'):
+        db.session.execute(table.insert(), rows)
+        return
+    insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+    stmt = insert(table).on_conflict_do_nothing(index_elements=['student_id']).returning(table.c.student_id)
+    inserted = set(db.session.execute(stmt, rows).scalars())
+    for row in rows:
+        if row['student_id'] in inserted:
+            continue
+        state = StudentAbsenceState.query.filter_by(
+            student_id=row['student_id']
+        ).with_for_update().populate_existing().one()
+        for student_id, day, previous, status in changes:
+            if student_id == state.student_id and not apply_change(state, day, previous, status):
+                refresh_state(state)
+
+def apply_change(state, day, previous, status):
+    # Devolve False quando o estado precisa ser relido do banco
+    if state.last_date is None:
+        if previous is not None or status is None:
+            return False
+    elif day.year < state.last_date.year:
+        # Anos letivos anteriores ao do estado não fazem parte dele
+        return True
+
+    if state.last_date is None or day > state.last_date:
+        if status is None:
+            return False
+        if state.last_date is None or day.year > state.last_date.year:
+            # Primeiro registro do estudante no ano letivo: o estado recomeça
+            state.recorded_mask = state.absent_mask = 0
+            state.streak = 0
+            state.streak_start = None
+        else:
+            shift = (day - state.last_date).days
+            state.recorded_mask = (state.recorded_mask << shift) & WINDOW_MASK
+            state.absent_mask = (state.absent_mask << shift) & WINDOW_MASK
+        if term_start(day) != state.term_start:
+            state.term_start = term_start(day)
+            state.term_present = state.term_absent = state.term_late = 0
+        state.last_date = day
+        if status == 'absent':
+            if not state.streak:
+                state.streak_start = day
+            state.streak += 1
+        else:
+            state.streak = 0
+            state.streak_start = None
+        set_day(state, day, status)
+        count_term(state, day, previous, status)
+        return True
+
+    # Registro igual ou anterior ao último dia: ajusta a janela e o semestre
+    set_day(state, day, status)
+    count_term(state, day, previous, status)
+
+    if day == state.last_date and status is None:
+        return False
+    if state.streak:
+        if day >= state.streak_start:
+            if previous is None and status == 'absent':
+                state.streak += 1
+                return True
+            return previous == status
+        # Antes da sequência só importa quem pode ser o registro que a interrompe
+        return not (status in ('absent', None) and previous != 'absent')
+    return not (day == state.last_date and status == 'absent')
+
+def set_day(state, day, status):
+    offset = (state.last_date - day).days
+    if offset >= WINDOW_DAYS:
+        return
+    bit = 1 << offset
+    state.recorded_mask = state.recorded_mask | bit if status is not None else state.recorded_mask & ~bit
+    state.absent_mask = state.absent_mask | bit if status == 'absent' else state.absent_mask & ~bit
+    state.window_recorded = bin(state.recorded_mask).count('1')
+    state.window_absent = bin(state.absent_mask).count('1')
+
+def count_term(state, day, previous, status):
+    if term_start(day) != state.term_start:
+        return
+    if previous in TERM_STATUSES:
+        setattr(state, f'term_{previous}', getattr(state, f'term_{previous}') - 1)
+    if status in TERM_STATUSES:
+        setattr(state, f'term_{status}', getattr(state, f'term_{status}') + 1)
+
+def refresh_state(state):
+    # Relê os registros do estudante do mais recente para trás, até cobrir a
+    # janela e encontrar o registro que interrompe a sequência de faltas
+    rows = db.session.execute(
+        select(Attendance.date, Attendance.status)
+        .where(Attendance.student_id == state.student_id)
+        .order_by(Attendance.date.desc())
+        .execution_options(yield_per=100)
+    )
+    recent = []
+    interrupted = False
+    for day, status in rows:
+        if recent and (day.year != recent[0][0].year or (
+                interrupted and (recent[0][0] - day).days >= WINDOW_DAYS)):
+            break
+        recent.append((day, status))
+        interrupted = interrupted or status != 'absent'
+    rows.close()
+
+    if not recent:
+        return False
+    previous_term = state.term_start
+    expected = compute_state(reversed(recent))
+    # A sequência vem de `recent`; o semestre só é recontado se o último dia mudou de semestre
+    for field in STATE_FIELDS:
+        if not field.startswith('term_') or expected['term_start'] != previous_term:
+            setattr(state, field, expected[field])
+    if expected['term_start'] != previous_term:
+        counts = db.session.execute(
+            select(Attendance.status, db.func.count())
+            .where(Attendance.student_id == state.student_id)
+            .where(Attendance.date.between(expected['term_start'], expected['last_date']))
+            .group_by(Attendance.status)
+        )
+        counts = dict(counts.all())
+        for status in TERM_STATUSES:
+            setattr(state, f'term_{status}', counts.get(status, 0))
+    return True
+
+def compute_state(records):
+    # Estado calculado do zero a partir dos registros do estudante em ordem de
+    # data: só o ano letivo do último registro é considerado
+    records = list(records)
+    last_date = records[-1][0]
+    records = [(day, status) for day, status in records if day.year == last_date.year]
+
+    state = dict.fromkeys(STATE_FIELDS, 0)
+    state['last_date'] = last_date
+    state['streak_start'] = None
+    for day, status in reversed(records):
+        if status != 'absent':
+            break
+        state['streak'] += 1
+        state['streak_start'] = day
+
+    for day, status in records:
+        offset = (last_date - day).days
+        if offset < WINDOW_DAYS:
+            state['recorded_mask'] |= 1 << offset
+            if status == 'absent':
+                state['absent_mask'] |= 1 << offset
+    state['window_recorded'] = bin(state['recorded_mask']).count('1')
+    state['window_absent'] = bin(state['absent_mask']).count('1')
+
+    state['term_start'] = term_start(last_date)
+    for day, status in records:
+        if term_start(day) == state['term_start'] and status in TERM_STATUSES:
+            state[f'term_{status}'] += 1
+    return state
+
+def compute_states(batch_size=10000):
+    # Percorre toda a tabela principal em ordem de estudante e data
+    rows = db.session.execute(
+        select(Attendance.student_id, Attendance.date, Attendance.status)
+        .order_by(Attendance.student_id, Attendance.date)
+        .execution_options(yield_per=batch_size)
+    )
+    for student_id, records in groupby(rows, key=lambda row: row[0]):
+        yield student_id, compute_state((day, status) for _, day, status in records)
+
+def rebuild_absence_states(batch_size=10000):
+    # Recalcula todos os estados a partir do histórico da tabela principal;
+    # anos arquivados não entram, já que o estado cobre só o ano letivo corrente
+    db.session.execute(delete(StudentAbsenceState))
+    batch = []
+    rebuilt = 0
+    for student_id, state in compute_states(batch_size):
+        batch.append(dict(state, student_id=student_id))
+        if len(batch) == batch_size:
+            db.session.execute(StudentAbsenceState.__table__.insert(), batch)
+            rebuilt += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(StudentAbsenceState.__table__.insert(), batch)
+        rebuilt += len(batch)
+    db.session.commit()
+    return rebuilt
+
+def verify_absence_states(batch_size=10000):
+    # Compara os estados gravados incrementalmente com o recálculo completo;
+    # devolve as divergências como (student_id, gravado, esperado)
+    stored = {
+        state.student_id: {field: getattr(state, field) for field in STATE_FIELDS}
+        for state in StudentAbsenceState.query
+    }
+    differences = []
+    for student_id, expected in compute_states(batch_size):
+        current = stored.pop(student_id, None)
+        if current != expected:
+            differences.append((student_id, current, expected))
+    differences.extend((student_id, current, None) for student_id, current in stored.items())
+    return differences
+
+def alert_conditions(streak, window_absences, term_rate, term_min_days):
+    total = (StudentAbsenceState.term_present + StudentAbsenceState.term_absent
+             + StudentAbsenceState.term_late)
+    return or_(
+        StudentAbsenceState.streak >= streak,
+        StudentAbsenceState.window_absent >= window_absences,
+        and_(total >= term_min_days, StudentAbsenceState.term_absent >= total * term_rate)
+    )
@@ -0,0 +1,35 @@
+from src.models.user import db
+from datetime import date, datetime
+
+class ArchivedYear(db.Model):
+    __tablename__ = 'archived_years'
+    
+    # Anos letivos encerrados cujas frequências foram movidas da tabela
+    # attendances para um arquivo SQLite somente leitura
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    filename = db.Column(db.String(255), nullable=False)
+    rows = db.Column(db.Integer, nullable=False)
+    min_id = db.Column(db.Integer, nullable=True)
+    max_id = db.Column(db.Integer, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @property
+    def first_day(self):
+        return date(self.year, 1, 1)
+    
+    @property
+    def last_day(self):
+        return date(self.year, 12, 31)
+    
+    def to_dict(self):
+        return {
+            'year': self.year,
+            'filename': self.filename,
+            'rows': self.rows,
+            'min_id': self.min_id,
+            'max_id': self.max_id,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+    
+    def __repr__(self):
+        return f'<ArchivedYear {self.year}>'
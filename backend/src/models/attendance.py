@@ -3,6 +3,12 @@ from datetime import datetime
 
 class Attendance(db.Model):
     __tablename__ = 'attendances'
+    __table_args__ = (
+        # Um registro por estudante por dia; o índice único também atende as
+        # buscas por (student_id, date)
+        db.Index('uq_attendances_student_date', 'student_id', 'date', unique=True),
+        db.Index('ix_attendances_class_date', 'class_id', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
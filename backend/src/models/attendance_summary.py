@@ -0,0 +1,156 @@
+from src.models.user import db
+from src.models.attendance import Attendance
+from src.models.archived_year import ArchivedYear
+from sqlalchemy import bindparam, case, func, not_, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from collections import defaultdict
+
+SUMMARY_STATUSES = ('present', 'absent', 'late')
+
+class ClassDailySummary(db.Model):
+    __tablename__ = 'attendance_class_daily'
+
+    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    present = db.Column(db.Integer, nullable=False, default=0)
+    absent = db.Column(db.Integer, nullable=False, default=0)
+    late = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return summary_dict({
+            'class_id': self.class_id,
+            'date': self.date.isoformat()
+        }, self.present, self.absent, self.late)
+
+    def __repr__(self):
+        return f'<ClassDailySummary {self.class_id} - {self.date}>'
+
+class StudentMonthlySummary(db.Model):
+    __tablename__ = 'attendance_student_monthly'
+
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)  # primeiro dia do mês
+    present = db.Column(db.Integer, nullable=False, default=0)
+    absent = db.Column(db.Integer, nullable=False, default=0)
+    late = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return summary_dict({
+            'student_id': self.student_id,
+            'month': self.month.strftime('%Y-%m')
+        }, self.present, self.absent, self.late)
+
+    def __repr__(self):
+        return f'<StudentMonthlySummary {self.student_id} - {self.month:%Y-%m}>'
+
+def summary_dict(keys, present, absent, late):
+    total = present + absent + late
+    return dict(keys, present=present, absent=absent, late=late, total=total,
+                absence_rate=round(absent / total, 4) if total else 0.0)
+
+def attendance_change(attendance, delta, status=None):
+    # Variação a aplicar nos resumos: +1 ao gravar, -1 ao remover um registro
+    return (attendance.class_id, attendance.student_id, attendance.date, status or attendance.status, delta)
+
+def update_summaries(changes):
+    # Agrupa as variações por chave e aplica um upsert incremental por tabela,
+    # na mesma transação da alteração da frequência
+    class_rows = defaultdict(lambda: dict.fromkeys(SUMMARY_STATUSES, 0))
+    student_rows = defaultdict(lambda: dict.fromkeys(SUMMARY_STATUSES, 0))
+    for class_id, student_id, day, status, delta in changes:
+        if status not in SUMMARY_STATUSES:
+            continue
+        class_rows[(int(class_id), day)][status] += delta
+        student_rows[(int(student_id), day.replace(day=1))][status] += delta
+
+    upsert(ClassDailySummary, [
+        dict(counts, class_id=class_id, date=day) for (class_id, day), counts in class_rows.items()
+    ])
+    upsert(StudentMonthlySummary, [
+        dict(counts, student_id=student_id, month=month) for (student_id, month), counts in student_rows.items()
+    ])
+
+def upsert(model, rows):
+    rows = [row for row in rows if any(row[status] for status in SUMMARY_STATUSES)]
+    if not rows:
+        return
+    table = model.__table__
+    keys = [column.name for column in table.primary_key]
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={status: table.c[status] + stmt.excluded[status] for status in SUMMARY_STATUSES}
+        )
+        db.session.execute(stmt, rows)
+    else:
+        # Demais bancos: atualiza e insere apenas as chaves que ainda não existem
+        for row in rows:
+            updated = db.session.execute(
+                table.update()
+                .where(*[table.c[key] == row[key] for key in keys])
+                .values({status: table.c[status] + row[status] for status in SUMMARY_STATUSES})
+            ).rowcount
+            if not updated:
+                db.session.execute(table.insert(), row)
+
+    # Remove os resumos que ficaram zerados após exclusões ou correções
+    emptied = [
+        {key: row[key] for key in keys}
+        for row in rows if any(row[status] < 0 for status in SUMMARY_STATUSES)
+    ]
+    if emptied:
+        db.session.execute(
+            table.delete()
+            .where(*[table.c[key] == bindparam(key) for key in keys])
+            .where(*[table.c[status] == 0 for status in SUMMARY_STATUSES]),
+            emptied
+        )
+
+def rebuild_summaries(batch_size=10000):
+    # Recalcula os resumos a partir de todo o histórico de frequências da
+    # tabela principal; os resumos dos anos arquivados são mantidos, já que
+    # suas frequências não estão mais nela
+    archived = ArchivedYear.query.all()
+    class_deleted = ClassDailySummary.__table__.delete()
+    student_deleted = StudentMonthlySummary.__table__.delete()
+    if archived:
+        class_deleted = class_deleted.where(not_(or_(*[
+            ClassDailySummary.date.between(year.first_day, year.last_day) for year in archived
+        ])))
+        student_deleted = student_deleted.where(not_(or_(*[
+            StudentMonthlySummary.month.between(year.first_day, year.last_day) for year in archived
+        ])))
+    db.session.execute(class_deleted)
+    db.session.execute(student_deleted)
+
+    counters = [
+        func.sum(case((Attendance.status == status, 1), else_=0)).label(status)
+        for status in SUMMARY_STATUSES
+    ]
+    class_rows = db.session.execute(
+        select(Attendance.class_id, Attendance.date, *counters)
+        .where(Attendance.status.in_(SUMMARY_STATUSES))
+        .group_by(Attendance.class_id, Attendance.date)
+    )
+    class_rows = [dict(row._mapping) for row in class_rows]
+    if class_rows:
+        db.session.execute(ClassDailySummary.__table__.insert(), class_rows)
+
+    student_rows = db.session.execute(
+        select(Attendance.student_id, Attendance.date, Attendance.status)
+        .where(Attendance.status.in_(SUMMARY_STATUSES))
+        .execution_options(yield_per=batch_size)
+    )
+    months = defaultdict(lambda: dict.fromkeys(SUMMARY_STATUSES, 0))
+    for student_id, day, status in student_rows:
+        months[(student_id, day.replace(day=1))][status] += 1
+    if months:
+        db.session.execute(StudentMonthlySummary.__table__.insert(), [
+            dict(counts, student_id=student_id, month=month) for (student_id, month), counts in months.items()
+        ])
+
+    db.session.commit()
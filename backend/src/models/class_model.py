@@ -1,4 +1,6 @@
 from src.models.user import db
+from src.models.student import Student
+from sqlalchemy import func, select
 from datetime import datetime
 
 class Class(db.Model):
@@ -14,6 +16,13 @@ class Class(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     
+    # Contagem agregada de estudantes calculada pelo banco na própria consulta
+    # da turma; use undefer(Class.student_count) em listagens
+    student_count = db.column_property(
+        select(func.count(Student.id)).where(Student.class_id == id).correlate_except(Student).scalar_subquery(),
+        deferred=True
+    )
+    
     # Relacionamentos
     students = db.relationship('Student', backref='class_ref', lazy=True)
     attendances = db.relationship('Attendance', backref='class_ref', lazy=True)
@@ -27,7 +36,7 @@ class Class(db.Model):
             'teacher': self.teacher,
             'description': self.description,
             'school_id': self.school_id,
-            'student_count': len(self.students),
+            'student_count': self.student_count,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'is_active': self.is_active
         }
@@ -0,0 +1,39 @@
+from src.models.user import db
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import datetime
+
+class CollectionVersion(db.Model):
+    __tablename__ = 'collection_versions'
+    
+    # Versão de cada coleção (turmas, estudantes), incrementada a cada
+    # alteração para gerar ETags sem consultar os registros
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    @classmethod
+    def bump(cls, *names):
+        # Incrementa na mesma transação da alteração que invalidou a coleção
+        now = datetime.utcnow()
+        table = cls.__table__
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            # Um único comando: duas transações criando a mesma coleção ao mesmo
+            # tempo não colidem na chave primária
+            insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['name'],
+                set_={'version': table.c.version + 1, 'updated_at': stmt.excluded.updated_at}
+            )
+            db.session.execute(stmt, [{'name': name, 'version': 1, 'updated_at': now} for name in names])
+            return
+        for name in names:
+            updated = db.session.execute(
+                table.update().where(table.c.name == name).values(version=table.c.version + 1, updated_at=now)
+            ).rowcount
+            if not updated:
+                db.session.execute(table.insert(), {'name': name, 'version': 1, 'updated_at': now})
+    
+    def __repr__(self):
+        return f'<CollectionVersion {self.name} {self.version}>'
@@ -0,0 +1,39 @@
+from src.models.user import db
+from datetime import datetime
+import json
+import uuid
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    type = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, succeeded, failed
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+    params = db.Column(db.Text, nullable=True)  # JSON
+    message = db.Column(db.Text, nullable=True)  # resumo do resultado ou erro
+    result_path = db.Column(db.String(255), nullable=True)
+    result_mimetype = db.Column(db.String(100), nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # renovado pelo processo que executa a tarefa
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.type,
+            'status': self.status,
+            'progress': round(self.progress, 4),
+            'params': json.loads(self.params) if self.params else {},
+            'message': self.message,
+            'has_result': self.result_path is not None,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f'<Job {self.type} {self.id}>'
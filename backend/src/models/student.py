@@ -13,7 +13,7 @@ class Student(db.Model):
     birth_date = db.Column(db.Date, nullable=True)
     parent_name = db.Column(db.String(100), nullable=True)
     parent_phone = db.Column(db.String(20), nullable=True)
-    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False)
+    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     
@@ -0,0 +1,89 @@
+from urllib.parse import urlencode
+
+from flask import current_app, request
+from sqlalchemy import inspect, select
+from src.models.user import db
+from src.serialization import json_response, row_encoder
+
+# Limite aplicado quando o cliente não envia ?limit=, para que listagens sem
+# paginação continuem funcionando sem devolver a tabela inteira
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 5000
+
+
+class PaginationError(ValueError):
+    pass
+
+
+class Page:
+    # Paginação por cursor (keyset) sobre a chave primária: ?limit=&after=
+    # e projeção opcional de colunas no SQL: ?fields=id,name. Sem fields=,
+    # seleciona todas as colunas públicas. A leitura usa select() do Core
+    # direto na conexão: as linhas são tuplas, sem objetos ORM, identity map
+    # ou rastreamento de alterações
+    def __init__(self, model, limit, after, fields):
+        self.model = model
+        self.limit = limit
+        self.after = after
+        self.fields = fields
+        attributes = inspect(model).column_attrs
+        self.columns = [attributes[name].expression.label(name) for name in fields]
+
+    @classmethod
+    def from_request(cls, model, hidden=()):
+        default_limit = current_app.config.get('PAGINATION_DEFAULT_LIMIT', DEFAULT_LIMIT)
+        max_limit = current_app.config.get('PAGINATION_MAX_LIMIT', MAX_LIMIT)
+
+        limit = request.args.get('limit', default_limit)
+        after = request.args.get('after')
+        try:
+            limit = int(limit)
+            after = int(after) if after else None
+        except ValueError:
+            raise PaginationError('limit e after devem ser números inteiros')
+        if limit < 1 or limit > max_limit:
+            raise PaginationError(f'limit deve estar entre 1 e {max_limit}')
+
+        available = [name for name in inspect(model).column_attrs.keys() if name not in hidden]
+        fields = available
+        if request.args.get('fields'):
+            fields = [name.strip() for name in request.args.get('fields').split(',') if name.strip()]
+            unknown = [name for name in fields if name not in available]
+            if unknown:
+                raise PaginationError(f'Campos inválidos: {", ".join(unknown)}')
+            # A chave primária é sempre necessária para o cursor
+            if 'id' not in fields:
+                fields.insert(0, 'id')
+
+        return cls(model, limit, after, fields)
+
+    def statement(self, *criteria):
+        primary_key = self.model.__table__.c.id
+        statement = select(*self.columns).where(*criteria)
+        if self.after is not None:
+            statement = statement.where(primary_key > self.after)
+        return statement.order_by(primary_key).limit(self.limit + 1)
+
+    def response(self, *criteria, archives=()):
+        # archives: engines de anos arquivados que também atendem o filtro; a
+        # mesma página é lida em cada um e as linhas são intercaladas pelo id
+        statement = self.statement(*criteria)
+        rows = db.session.connection().execute(statement).all()
+        for engine in archives:
+            with engine.connect() as connection:
+                rows.extend(connection.execute(statement).all())
+        if archives:
+            rows.sort(key=lambda row: row.id)
+            rows = rows[:self.limit + 1]
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+
+        encode = row_encoder(self.columns)
+        response = json_response([encode(row) for row in rows])
+        if has_more:
+            next_cursor = rows[-1].id
+            args = request.args.to_dict()
+            args.update(after=next_cursor, limit=self.limit)
+            response.headers['X-Next-Cursor'] = str(next_cursor)
+            response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+        return response
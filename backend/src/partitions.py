@@ -0,0 +1,127 @@
+import os
+import threading
+from datetime import date
+
+from flask import current_app
+from sqlalchemy import create_engine, delete, func, select
+from src.models.user import db
+from src.models.attendance import Attendance
+from src.models.archived_year import ArchivedYear
+from src.models.absence_state import StudentAbsenceState
+
+# Configuração:
+#   ARCHIVE_DIR  diretório dos arquivos SQLite dos anos letivos arquivados
+#
+# O ano letivo coincide com o ano civil (fevereiro a dezembro). Anos
+# encerrados saem da tabela attendances para um arquivo por ano, aberto
+# somente para leitura; as consultas só abrem esses arquivos quando o período
+# pedido alcança um ano arquivado, então as do ano corrente só tocam a tabela
+# principal, que guarda apenas os anos em aberto
+ARCHIVE_DIR = os.path.join(os.path.dirname(__file__), 'database', 'archive')
+ARCHIVE_BATCH_SIZE = 10000
+
+
+class ArchivedYearError(Exception):
+    pass
+
+
+def school_year(day):
+    return day.year
+
+
+def current_school_year():
+    return school_year(date.today())
+
+
+def archive_dir():
+    return current_app.config.get('ARCHIVE_DIR', ARCHIVE_DIR)
+
+
+def archived_years(date_from=None, date_to=None, after=None):
+    # Anos arquivados que o período [date_from, date_to] alcança; `after` é
+    # o cursor da paginação: anos cujos ids já passaram ficam de fora
+    if date_from and school_year(date_from) >= current_school_year():
+        return []
+    query = ArchivedYear.query
+    if date_from:
+        query = query.filter(ArchivedYear.year >= school_year(date_from))
+    if date_to:
+        query = query.filter(ArchivedYear.year <= school_year(date_to))
+    if after is not None:
+        query = query.filter(ArchivedYear.max_id > after)
+    return query.order_by(ArchivedYear.year).all()
+
+
+_engines_lock = threading.Lock()
+
+
+def archive_engine(archived):
+    # Um engine somente leitura por arquivo, criado no primeiro uso
+    with _engines_lock:
+        engines = current_app.extensions.setdefault('archive_engines', {})
+        if archived.year not in engines:
+            path = os.path.join(archive_dir(), archived.filename)
+            engines[archived.year] = create_engine(f'sqlite:///file:{path}?mode=ro&uri=true')
+        return engines[archived.year]
+
+
+def archive_engines(date_from=None, date_to=None, after=None):
+    return [archive_engine(archived) for archived in archived_years(date_from, date_to, after)]
+
+
+def ensure_writable(day):
+    # Anos arquivados são somente leitura; o ano corrente nunca está arquivado
+    year = school_year(day)
+    if year < current_school_year() and db.session.get(ArchivedYear, year):
+        raise ArchivedYearError(f'O ano letivo {year} está arquivado e não aceita alterações')
+
+
+def archive_year(year, batch_size=ARCHIVE_BATCH_SIZE):
+    if year >= current_school_year():
+        raise ArchivedYearError('Somente anos letivos encerrados podem ser arquivados')
+    if db.session.get(ArchivedYear, year):
+        raise ArchivedYearError(f'O ano letivo {year} já está arquivado')
+
+    in_year = Attendance.date.between(date(year, 1, 1), date(year, 12, 31))
+    table = Attendance.__table__
+    os.makedirs(archive_dir(), exist_ok=True)
+    filename = f'attendances_{year}.db'
+    path = os.path.join(archive_dir(), filename)
+    if os.path.exists(path):
+        # Sobra de uma tentativa interrompida: o ano ainda não foi registrado
+        os.remove(path)
+
+    # Copia o ano em lotes para um arquivo novo, com os mesmos ids e índices
+    engine = create_engine(f'sqlite:///{path}')
+    try:
+        table.create(engine)
+        rows = db.session.execute(
+            select(table).where(in_year).order_by(table.c.id).execution_options(yield_per=batch_size)
+        )
+        with engine.begin() as archive:
+            for partition in rows.partitions():
+                archive.execute(table.insert(), [dict(row._mapping) for row in partition])
+        with engine.connect() as archive:
+            archive.exec_driver_sql('VACUUM')
+            copied, min_id, max_id = archive.execute(
+                select(func.count(), func.min(table.c.id), func.max(table.c.id))
+            ).one()
+    finally:
+        engine.dispose()
+
+    # Registra o ano e remove as linhas na mesma transação; se alguém gravou
+    # no ano durante a cópia, nada é removido
+    db.session.add(ArchivedYear(year=year, filename=filename, rows=copied, min_id=min_id, max_id=max_id))
+    deleted = db.session.execute(delete(Attendance).where(in_year)).rowcount
+    # Estados de faltas de estudantes sem registros depois do ano arquivado
+    # vinham todos dele; o estado cobre só frequências da tabela principal
+    db.session.execute(delete(StudentAbsenceState).where(
+        StudentAbsenceState.last_date.between(date(year, 1, 1), date(year, 12, 31))
+    ))
+    if deleted != copied:
+        db.session.rollback()
+        os.remove(path)
+        raise ArchivedYearError(f'O ano letivo {year} foi alterado durante o arquivamento, tente novamente')
+    db.session.commit()
+    os.chmod(path, 0o444)
+    return copied
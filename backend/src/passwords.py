@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+# Política de hash configurável pela aplicação:
+#   PASSWORD_HASH_METHOD   método do werkzeug, ex. 'pbkdf2:sha256:600000' ou 'scrypt:32768:8:1'
+#   PASSWORD_CHECK_WORKERS threads dedicadas à verificação de senhas
+#   PASSWORD_CHECK_QUEUE   verificações que podem aguardar uma thread livre
+#   PASSWORD_CHECK_TIMEOUT segundos de espera por uma vaga antes de recusar o login
+PASSWORD_HASH_METHOD = f'pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}'
+PASSWORD_CHECK_WORKERS = 4
+PASSWORD_CHECK_QUEUE = 16
+PASSWORD_CHECK_TIMEOUT = 5
+
+
+class PasswordCheckBusy(Exception):
+    pass
+
+
+def hash_method():
+    return normalize_method(current_app.config.get('PASSWORD_HASH_METHOD', PASSWORD_HASH_METHOD))
+
+
+def normalize_method(method):
+    # Completa os parâmetros padrão do werkzeug para que o método configurado
+    # possa ser comparado com o prefixo dos hashes já gravados
+    name, *args = method.split(':')
+    if name == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iterations = args[1] if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{iterations}'
+    if name == 'scrypt':
+        # scrypt:n:r:p, padrões do werkzeug 2**15, 8 e 1
+        n, r, p = args + ['32768', '8', '1'][len(args):]
+        return f'scrypt:{n}:{r}:{p}'
+    return method
+
+
+def hash_password(password):
+    return generate_password_hash(password, method=hash_method())
+
+
+def needs_rehash(password_hash):
+    return password_hash.split('$', 1)[0] != hash_method()
+
+
+class PasswordChecker:
+    # Pool limitado de threads para a verificação de senhas. O hashlib libera o
+    # GIL durante o pbkdf2/scrypt, então as verificações rodam em paralelo sem
+    # ocupar mais que PASSWORD_CHECK_WORKERS núcleos; quando a fila enche, o
+    # login é recusado rapidamente em vez de prender todos os workers WSGI
+    def __init__(self, workers, queue):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-check')
+        self._slots = threading.BoundedSemaphore(workers + queue)
+
+    def check(self, password_hash, password, timeout):
+        if not self._slots.acquire(timeout=timeout):
+            raise PasswordCheckBusy()
+        try:
+            return self._executor.submit(check_password_hash, password_hash, password).result()
+        finally:
+            self._slots.release()
+
+
+_checker_lock = threading.Lock()
+
+
+def password_checker():
+    with _checker_lock:
+        if 'password_checker' not in current_app.extensions:
+            current_app.extensions['password_checker'] = PasswordChecker(
+                current_app.config.get('PASSWORD_CHECK_WORKERS', PASSWORD_CHECK_WORKERS),
+                current_app.config.get('PASSWORD_CHECK_QUEUE', PASSWORD_CHECK_QUEUE)
+            )
+        return current_app.extensions['password_checker']
+
+
+def verify_password(password_hash, password):
+    return password_checker().check(
+        password_hash,
+        password,
+        current_app.config.get('PASSWORD_CHECK_TIMEOUT', PASSWORD_CHECK_TIMEOUT)
+    )
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from src.models.collection_version import CollectionVersion
+
+# Configuração:
+#   RESPONSE_CACHE_BACKEND   'memory' (LRU por processo) ou 'redis' (compartilhado)
+#   RESPONSE_CACHE_REDIS_URL endereço do Redis; sem ele, 'redis' usa um substituto
+#                            local com a mesma interface (desenvolvimento)
+#   RESPONSE_CACHE_SIZE      entradas mantidas pelo backend em memória
+#
+# A invalidação não depende do backend: as chaves incluem as versões das
+# coleções em collection_versions, incrementadas na mesma transação de cada
+# alteração (CollectionVersion.bump). Todos os processos leem o mesmo banco,
+# então uma alteração feita em um deles torna inacessíveis as entradas
+# antigas no cache em memória de todos os outros
+RESPONSE_CACHE_SIZE = 512
+
+
+class LRUBackend:
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl if ttl else None, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class RedisBackend:
+    # Compartilhado entre processos; os valores são gravados como JSON
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url):
+        import redis
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key):
+        value = self.client.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, json.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+
+class LocalRedis:
+    # Substituto local do cliente Redis com os comandos usados pelo
+    # RedisBackend, para rodar sem um servidor Redis
+    def __init__(self):
+        self._backend = LRUBackend(max_entries=RESPONSE_CACHE_SIZE)
+
+    def get(self, key):
+        return self._backend.get(key)
+
+    def set(self, key, value, px=None):
+        self._backend.set(key, value, px / 1000 if px else None)
+
+
+class ResponseCache:
+    # Cache de resultados de endpoints com expiração e stale-while-revalidate:
+    # depois de `ttl` segundos o valor antigo continua sendo servido por até
+    # `stale_ttl` segundos enquanto uma thread o recalcula em segundo plano
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def key(self, endpoint, params, depends_on):
+        # As versões das coleções fazem parte da chave: alterar uma coleção
+        # torna inacessíveis todas as entradas que dependem dela
+        versions = dict(
+            CollectionVersion.query.with_entities(CollectionVersion.name, CollectionVersion.version)
+            .filter(CollectionVersion.name.in_(depends_on))
+        ) if depends_on else {}
+        generations = [versions.get(name, 0) for name in depends_on]
+        raw = json.dumps([endpoint, sorted(params.items()), generations])
+        return 'response:' + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get_or_compute(self, endpoint, params, compute, depends_on=(), ttl=30, stale_ttl=300):
+        key = self.key(endpoint, dict(params), depends_on)
+        entry = self.backend.get(key)
+        now = time.time()
+
+        if entry is not None and entry['fresh_until'] > now:
+            self._count('hits')
+            return entry['value']
+        if entry is not None:
+            self._count('stale_hits')
+            self._refresh_in_background(key, compute, ttl, stale_ttl)
+            return entry['value']
+
+        self._count('misses')
+        return self._store(key, compute(), ttl, stale_ttl)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'stale_hits': self.stale_hits, 'misses': self.misses}
+
+    def _count(self, name):
+        # += não é atômico entre as threads do processo
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _store(self, key, value, ttl, stale_ttl):
+        self.backend.set(key, {'value': value, 'fresh_until': time.time() + ttl}, ttl + stale_ttl)
+        return value
+
+    def _refresh_in_background(self, key, compute, ttl, stale_ttl):
+        # Uma única atualização por chave em andamento neste processo
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        app = current_app._get_current_object()
+
+        def refresh():
+            try:
+                with app.app_context():
+                    self._store(key, compute(), ttl, stale_ttl)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+
+_cache_lock = threading.Lock()
+
+
+def response_cache():
+    with _cache_lock:
+        if 'response_cache' not in current_app.extensions:
+            if current_app.config.get('RESPONSE_CACHE_BACKEND', 'memory') == 'redis':
+                url = current_app.config.get('RESPONSE_CACHE_REDIS_URL')
+                backend = RedisBackend.from_url(url) if url else RedisBackend(LocalRedis())
+            else:
+                backend = LRUBackend(current_app.config.get('RESPONSE_CACHE_SIZE', RESPONSE_CACHE_SIZE))
+            current_app.extensions['response_cache'] = ResponseCache(backend)
+        return current_app.extensions['response_cache']
+
@@ -0,0 +1,101 @@
+from flask import Blueprint, current_app, request, jsonify
+from src.authentication import require_auth
+from src.models.class_model import Class
+from src.models.absence_state import term_start
+from src.analytics import (
+    ANALYTICS_CHRONIC_RATE, COHORT_FIELDS, cohorts, heatmap, load_columns, weekdays
+)
+from src.exports import parse_export_dates
+from src.partitions import archive_engines
+from datetime import date
+
+analytics_bp = Blueprint('analytics', __name__)
+
+def scope_classes():
+    # Turmas do escopo pedido (class_id ou school_id); None = todas
+    query = Class.query
+    if request.args.get('class_id'):
+        query = query.filter(Class.id == int(request.args.get('class_id')))
+    elif request.args.get('school_id'):
+        query = query.filter(Class.school_id == int(request.args.get('school_id')))
+    else:
+        return None, query.all()
+    classes = query.all()
+    return [cls.id for cls in classes], classes
+
+def load_scope(class_ids):
+    # Sem período informado, o semestre letivo corrente
+    date_from, date_to = parse_export_dates(request.args.get('from'), request.args.get('to'))
+    if not date_from and not date_to:
+        date_from, date_to = term_start(date.today()), date.today()
+    columns = load_columns(class_ids, date_from, date_to, archive_engines(date_from, date_to))
+    return columns, {
+        'from': date_from.isoformat() if date_from else None,
+        'to': date_to.isoformat() if date_to else None,
+        'records': len(columns)
+    }
+
+@analytics_bp.route('/heatmap', methods=['GET'])
+def get_heatmap():
+    try:
+        user = require_auth()
+        if not user:
+            return jsonify({'error': 'Não autenticado'}), 401
+
+        class_ids, classes = scope_classes()
+        columns, scope = load_scope(class_ids)
+        result = heatmap(columns)
+        names = {cls.id: cls.name for cls in classes}
+        result['classes'] = [{'id': class_id, 'name': names.get(class_id)} for class_id in result['classes']]
+        return jsonify(dict(scope, **result)), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/weekdays', methods=['GET'])
+def get_weekdays():
+    try:
+        user = require_auth()
+        if not user:
+            return jsonify({'error': 'Não autenticado'}), 401
+
+        class_ids, _ = scope_classes()
+        columns, scope = load_scope(class_ids)
+        return jsonify(dict(scope, weekdays=weekdays(columns))), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/cohorts', methods=['GET'])
+def get_cohorts():
+    try:
+        user = require_auth()
+        if not user:
+            return jsonify({'error': 'Não autenticado'}), 401
+
+        group_by = request.args.get('group_by', 'grade')
+        if group_by not in COHORT_FIELDS:
+            return jsonify({'error': f'group_by deve ser um de: {", ".join(COHORT_FIELDS)}'}), 400
+
+        class_ids, classes = scope_classes()
+        names = sorted({getattr(cls, group_by) for cls in classes})
+        positions = {name: index for index, name in enumerate(names)}
+        class_cohorts = {cls.id: positions[getattr(cls, group_by)] for cls in classes}
+
+        columns, scope = load_scope(class_ids)
+        chronic_rate = current_app.config.get('ANALYTICS_CHRONIC_RATE', ANALYTICS_CHRONIC_RATE)
+        return jsonify(dict(
+            scope,
+            group_by=group_by,
+            chronic_rate=chronic_rate,
+            cohorts=cohorts(columns, class_cohorts, names, chronic_rate)
+        )), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,17 +1,43 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from src.models.user import User, db
+from src.authentication import require_auth
 from src.models.attendance import Attendance
 from src.models.student import Student
 from src.models.class_model import Class
+from src.models.attendance_summary import (
+    ClassDailySummary, StudentMonthlySummary, attendance_change, summary_dict, update_summaries
+)
+from src.models.absence_state import (
+    ABSENCE_ALERT_STREAK, ABSENCE_ALERT_TERM_MIN_DAYS, ABSENCE_ALERT_TERM_RATE, ABSENCE_ALERT_WINDOW_ABSENCES,
+    StudentAbsenceState, absence_change, alert_conditions, update_absence_states
+)
+from src.pagination import Page, PaginationError
+from src.response_cache import response_cache
+from src.exports import EXPORT_FORMATS, attendance_export_query, iter_export, parse_export_dates
+from src.partitions import ArchivedYearError, archive_engines, current_school_year, ensure_writable
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, date
 
 attendance_bp = Blueprint('attendance', __name__)
 
-def require_auth():
-    user_id = session.get('user_id')
-    if not user_id:
+ATTENDANCE_STATUSES = ('present', 'absent', 'late')
+
+def parse_id(value):
+    # Aceita inteiros e strings numéricas; listas, objetos e booleanos não
+    if isinstance(value, bool):
         return None
-    return User.query.get(user_id)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+def compute_statistics():
+    return {
+        'totalClasses': Class.query.filter_by(is_active=True).count(),
+        'totalStudents': Student.query.filter_by(is_active=True).count(),
+        'totalTeachers': User.query.filter_by(role='teacher', is_active=True).count()
+    }
 
 @attendance_bp.route('/statistics', methods=['GET'])
 def get_statistics():
@@ -20,16 +46,144 @@ def get_statistics():
         if not user:
             return jsonify({'error': 'Não autenticado'}), 401
         
-        total_classes = Class.query.filter_by(is_active=True).count()
-        total_students = Student.query.filter_by(is_active=True).count()
-        total_teachers = User.query.filter_by(role='teacher', is_active=True).count()
+        statistics = response_cache().get_or_compute(
+            'attendance.statistics',
+            request.args,
+            compute_statistics,
+            depends_on=('classes', 'students', 'users')
+        )
+        return jsonify(statistics), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@attendance_bp.route('/summary/classes', methods=['GET'])
+def get_class_summaries():
+    try:
+        user = require_auth()
+        if not user:
+            return jsonify({'error': 'Não autenticado'}), 401
+        
+        query = ClassDailySummary.query
+        
+        if request.args.get('class_id'):
+            query = query.filter_by(class_id=int(request.args.get('class_id')))
+        if request.args.get('from'):
+            query = query.filter(ClassDailySummary.date >= datetime.strptime(request.args.get('from'), '%Y-%m-%d').date())
+        if request.args.get('to'):
+            query = query.filter(ClassDailySummary.date <= datetime.strptime(request.args.get('to'), '%Y-%m-%d').date())
+        
+        summaries = query.order_by(ClassDailySummary.class_id, ClassDailySummary.date).all()
+        
+        if request.args.get('period') == 'month':
+            # Consolida os resumos diários da turma por mês
+            months = {}
+            for summary in summaries:
+                key = (summary.class_id, summary.date.strftime('%Y-%m'))
+                counts = months.setdefault(key, [0, 0, 0])
+                counts[0] += summary.present
+                counts[1] += summary.absent
+                counts[2] += summary.late
+            return jsonify([
+                summary_dict({'class_id': class_id, 'month': month}, *counts)
+                for (class_id, month), counts in months.items()
+            ]), 200
+        
+        return jsonify([summary.to_dict() for summary in summaries]), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@attendance_bp.route('/summary/students', methods=['GET'])
+def get_student_summaries():
+    try:
+        user = require_auth()
+        if not user:
+            return jsonify({'error': 'Não autenticado'}), 401
+        
+        query = StudentMonthlySummary.query
+        
+        if request.args.get('student_id'):
+            query = query.filter_by(student_id=int(request.args.get('student_id')))
+        if request.args.get('class_id'):
+            query = query.filter(StudentMonthlySummary.student_id.in_(
+                Student.query.with_entities(Student.id).filter_by(class_id=int(request.args.get('class_id')))
+            ))
+        if request.args.get('from'):
+            query = query.filter(StudentMonthlySummary.month >= datetime.strptime(request.args.get('from'), '%Y-%m').date())
+        if request.args.get('to'):
+            query = query.filter(StudentMonthlySummary.month <= datetime.strptime(request.args.get('to'), '%Y-%m').date())
+        
+        summaries = query.order_by(StudentMonthlySummary.student_id, StudentMonthlySummary.month).all()
+        return jsonify([summary.to_dict() for summary in summaries]), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@attendance_bp.route('/alerts', methods=['GET'])
+def get_absence_alerts():
+    try:
+        user = require_auth()
+        if not user:
+            return jsonify({'error': 'Não autenticado'}), 401
+        
+        # Lê apenas o estado mantido a cada gravação, sem percorrer o histórico
+        config = current_app.config
+        streak = int(request.args.get('streak', config.get('ABSENCE_ALERT_STREAK', ABSENCE_ALERT_STREAK)))
+        window_absences = int(request.args.get(
+            'window_absences', config.get('ABSENCE_ALERT_WINDOW_ABSENCES', ABSENCE_ALERT_WINDOW_ABSENCES)
+        ))
+        term_rate = float(request.args.get('term_rate', config.get('ABSENCE_ALERT_TERM_RATE', ABSENCE_ALERT_TERM_RATE)))
+        term_min_days = int(request.args.get(
+            'term_min_days', config.get('ABSENCE_ALERT_TERM_MIN_DAYS', ABSENCE_ALERT_TERM_MIN_DAYS)
+        ))
+        
+        query = db.session.query(StudentAbsenceState, Student).join(
+            Student, Student.id == StudentAbsenceState.student_id
+        ).filter(
+            Student.is_active == True,
+            # Estados de anos anteriores pertencem a estudantes sem registros no ano corrente
+            StudentAbsenceState.last_date >= date(current_school_year(), 1, 1),
+            alert_conditions(streak, window_absences, term_rate, term_min_days)
+        )
+        if request.args.get('class_id'):
+            query = query.filter(Student.class_id == int(request.args.get('class_id')))
+        
+        alerts = []
+        for state, student in query.order_by(
+            StudentAbsenceState.streak.desc(), StudentAbsenceState.window_absent.desc(), Student.name
+        ):
+            reasons = []
+            if state.streak >= streak:
+                reasons.append('consecutive')
+            if state.window_absent >= window_absences:
+                reasons.append('window')
+            if state.term_total >= term_min_days and state.term_absent >= state.term_total * term_rate:
+                reasons.append('term')
+            alerts.append(dict(
+                state.to_dict(),
+                name=student.name,
+                registration=student.student_id,
+                class_id=student.class_id,
+                reasons=reasons
+            ))
         
         return jsonify({
-            'totalClasses': total_classes,
-            'totalStudents': total_students,
-            'totalTeachers': total_teachers
+            'thresholds': {
+                'streak': streak,
+                'window_absences': window_absences,
+                'term_rate': term_rate,
+                'term_min_days': term_min_days
+            },
+            'alerts': alerts
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -42,19 +196,59 @@ def get_attendances():
         
         class_id = request.args.get('class_id')
         date_str = request.args.get('date')
+        date_from, date_to = parse_export_dates(request.args.get('from'), request.args.get('to'))
         
-        query = Attendance.query
+        criteria = []
         
         if class_id:
-            query = query.filter_by(class_id=class_id)
+            criteria.append(Attendance.class_id == int(class_id))
         
         if date_str:
             attendance_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            query = query.filter_by(date=attendance_date)
+            criteria.append(Attendance.date == attendance_date)
+            date_from = date_to = attendance_date
+        if date_from:
+            criteria.append(Attendance.date >= date_from)
+        if date_to:
+            criteria.append(Attendance.date <= date_to)
+        
+        # Anos arquivados só são consultados quando o período os alcança
+        page = Page.from_request(Attendance)
+        archives = archive_engines(date_from, date_to, page.after)
+        return page.response(*criteria, archives=archives), 200
+        
+    except (PaginationError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@attendance_bp.route('/export', methods=['GET'])
+def export_attendances():
+    try:
+        user = require_auth()
+        if not user:
+            return jsonify({'error': 'Não autenticado'}), 401
+        
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': 'Formato deve ser ndjson ou csv'}), 400
         
-        attendances = query.all()
-        return jsonify([attendance.to_dict() for attendance in attendances]), 200
+        query = attendance_export_query(
+            class_id=request.args.get('class_id'),
+            date_from=request.args.get('from'),
+            date_to=request.args.get('to')
+        )
+        archives = archive_engines(*parse_export_dates(request.args.get('from'), request.args.get('to')))
+        
+        response = Response(
+            stream_with_context(iter_export(query, export_format, archives=archives)),
+            mimetype=EXPORT_FORMATS[export_format]
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename=frequencias.{export_format}'
+        return response
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -68,15 +262,7 @@ def create_attendance():
         data = request.get_json()
         
         attendance_date = datetime.strptime(data.get('date'), '%Y-%m-%d').date()
-        
-        # Verificar se já existe registro para este estudante nesta data
-        existing = Attendance.query.filter_by(
-            student_id=data.get('student_id'),
-            date=attendance_date
-        ).first()
-        
-        if existing:
-            return jsonify({'error': 'Frequência já registrada para este estudante nesta data'}), 400
+        ensure_writable(attendance_date)
         
         new_attendance = Attendance(
             student_id=data.get('student_id'),
@@ -88,10 +274,155 @@ def create_attendance():
         )
         
         db.session.add(new_attendance)
+        update_summaries([attendance_change(new_attendance, 1)])
+        update_absence_states([absence_change(new_attendance, None, new_attendance.status)])
         db.session.commit()
         
         return jsonify(new_attendance.to_dict()), 201
         
+    except ArchivedYearError as e:
+        return jsonify({'error': str(e)}), 409
+    except IntegrityError as e:
+        db.session.rollback()
+        # O índice único (student_id, date) impede registros duplicados
+        existing = Attendance.query.filter_by(
+            student_id=data.get('student_id'),
+            date=attendance_date
+        ).first()
+        if existing:
+            return jsonify({'error': 'Frequência já registrada para este estudante nesta data'}), 400
+        return jsonify({'error': str(e)}), 500
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@attendance_bp.route('/batch', methods=['POST'])
+def create_attendance_batch():
+    try:
+        user = require_auth()
+        if not user:
+            return jsonify({'error': 'Não autenticado'}), 401
+        
+        data = request.get_json() or {}
+        
+        if not isinstance(data, dict) or not data.get('class_id') or not data.get('date'):
+            return jsonify({'error': 'class_id e date são obrigatórios'}), 400
+        
+        class_id = parse_id(data.get('class_id'))
+        if class_id is None:
+            return jsonify({'error': 'class_id inválido'}), 400
+        try:
+            attendance_date = datetime.strptime(str(data.get('date')), '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Data inválida, use o formato AAAA-MM-DD'}), 400
+        records = data.get('records') or []
+        
+        if not isinstance(records, list):
+            return jsonify({'error': 'records deve ser uma lista'}), 400
+        if not records:
+            return jsonify({'error': 'Nenhum registro de frequência enviado'}), 400
+        ensure_writable(attendance_date)
+        
+        # Registros que não são objetos ou sem student_id inteiro viram erro
+        # da própria linha, sem derrubar o restante da chamada
+        for record in records:
+            if isinstance(record, dict):
+                record['student_id'] = parse_id(record.get('student_id'))
+        student_ids = {
+            record['student_id'] for record in records
+            if isinstance(record, dict) and record['student_id'] is not None
+        }
+        
+        # Uma única consulta para validar o roster da turma
+        roster = {
+            row.id for row in Student.query.with_entities(Student.id).filter(
+                Student.class_id == class_id,
+                Student.is_active == True,
+                Student.id.in_(student_ids)
+            )
+        }
+        
+        # Uma única consulta para os registros já existentes nesta data
+        existing = {
+            attendance.student_id: attendance for attendance in Attendance.query.filter(
+                Attendance.date == attendance_date,
+                Attendance.student_id.in_(roster)
+            )
+        }
+        
+        results = []
+        changes = []
+        absences = []
+        seen = set()
+        for record in records:
+            if not isinstance(record, dict):
+                results.append({'student_id': None, 'result': 'error', 'error': 'Registro inválido'})
+                continue
+            student_id = record['student_id']
+            status = record.get('status')
+            
+            if student_id is None:
+                results.append({'student_id': None, 'result': 'error', 'error': 'student_id inválido'})
+                continue
+            if student_id not in roster:
+                results.append({'student_id': student_id, 'result': 'error', 'error': 'Estudante não pertence a esta turma'})
+                continue
+            if student_id in seen:
+                results.append({'student_id': student_id, 'result': 'error', 'error': 'Estudante repetido no envio'})
+                continue
+            if status not in ATTENDANCE_STATUSES:
+                results.append({'student_id': student_id, 'result': 'error', 'error': 'Status inválido'})
+                continue
+            seen.add(student_id)
+            
+            attendance = existing.get(student_id)
+            if attendance:
+                if attendance.status != status:
+                    changes.append(attendance_change(attendance, -1))
+                    changes.append(attendance_change(attendance, 1, status))
+                    absences.append(absence_change(attendance, attendance.status, status))
+                attendance.status = status
+                attendance.notes = record.get('notes', attendance.notes)
+                results.append({'student_id': student_id, 'result': 'updated', 'attendance': attendance})
+            else:
+                attendance = Attendance(
+                    student_id=student_id,
+                    class_id=class_id,
+                    date=attendance_date,
+                    status=status,
+                    notes=record.get('notes', ''),
+                    recorded_by=user.id
+                )
+                db.session.add(attendance)
+                changes.append(attendance_change(attendance, 1))
+                absences.append(absence_change(attendance, None, status))
+                results.append({'student_id': student_id, 'result': 'created', 'attendance': attendance})
+        
+        # Toda a chamada é gravada em uma única transação; serializa antes do
+        # commit para não recarregar cada registro expirado
+        update_summaries(changes)
+        update_absence_states(absences)
+        db.session.flush()
+        for result in results:
+            if 'attendance' in result:
+                result['attendance'] = result['attendance'].to_dict()
+        db.session.commit()
+        
+        return jsonify({
+            'class_id': class_id,
+            'date': attendance_date.isoformat(),
+            'created': sum(1 for result in results if result['result'] == 'created'),
+            'updated': sum(1 for result in results if result['result'] == 'updated'),
+            'errors': sum(1 for result in results if result['result'] == 'error'),
+            'results': results
+        }), 200
+        
+    except ArchivedYearError as e:
+        return jsonify({'error': str(e)}), 409
+    except IntegrityError:
+        db.session.rollback()
+        # Outro envio gravou a mesma chamada entre a leitura e o commit
+        return jsonify({'error': 'Frequência registrada simultaneamente por outro envio, tente novamente'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -106,9 +437,17 @@ def update_attendance(attendance_id):
         attendance = Attendance.query.get_or_404(attendance_id)
         data = request.get_json()
         
+        previous_status = attendance.status
         attendance.status = data.get('status', attendance.status)
         attendance.notes = data.get('notes', attendance.notes)
         
+        if attendance.status != previous_status:
+            update_summaries([
+                attendance_change(attendance, -1, previous_status),
+                attendance_change(attendance, 1)
+            ])
+            update_absence_states([absence_change(attendance, previous_status, attendance.status)])
+        
         db.session.commit()
         
         return jsonify(attendance.to_dict()), 200
@@ -125,7 +464,11 @@ def delete_attendance(attendance_id):
             return jsonify({'error': 'Não autenticado'}), 401
         
         attendance = Attendance.query.get_or_404(attendance_id)
+        update_summaries([attendance_change(attendance, -1)])
         db.session.delete(attendance)
+        # Removido antes de atualizar o estado: a releitura não deve encontrá-lo
+        db.session.flush()
+        update_absence_states([absence_change(attendance, attendance.status, None)])
         db.session.commit()
         
         return jsonify({'message': 'Registro de frequência excluído com sucesso'}), 200
@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify, session
 from src.models.user import User, db
+from src.authentication import remember_user, require_admin, user_cache
+from src.passwords import PasswordCheckBusy, needs_rehash, verify_password
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -15,12 +17,19 @@ def login():
         
         user = User.query.filter_by(username=username).first()
         
-        if user and user.check_password(password) and user.is_active:
+        if user and verify_password(user.password_hash, password) and user.is_active:
+            # Atualiza o hash quando a política de senhas mudou desde a gravação
+            if needs_rehash(user.password_hash):
+                user.set_password(password)
+                db.session.commit()
             session['user_id'] = user.id
+            remember_user(user)
             return jsonify(user.to_dict()), 200
         else:
             return jsonify({'error': 'Credenciais inválidas'}), 401
             
+    except PasswordCheckBusy:
+        return jsonify({'error': 'Servidor ocupado, tente novamente em instantes'}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -45,3 +54,15 @@ def get_current_user():
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@auth_bp.route('/cache-stats', methods=['GET'])
+def get_cache_stats():
+    try:
+        user = require_admin()
+        if not user:
+            return jsonify({'error': 'Acesso negado'}), 403
+        
+        return jsonify(user_cache().stats()), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
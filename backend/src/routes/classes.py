@@ -1,15 +1,19 @@
-from flask import Blueprint, request, jsonify, session
-from src.models.user import User, db
+from flask import Blueprint, request, jsonify
+from src.models.user import db
+from src.authentication import require_auth
 from src.models.class_model import Class
+from src.models.student import Student
+from src.models.attendance import Attendance
+from src.models.collection_version import CollectionVersion
+from src.pagination import Page, PaginationError
+from src.http_cache import CollectionStamp
+from src.serialization import json_response, row_encoder
+from src.partitions import archive_engines
+from sqlalchemy import and_, select
+from datetime import datetime
 
 classes_bp = Blueprint('classes', __name__)
 
-def require_auth():
-    user_id = session.get('user_id')
-    if not user_id:
-        return None
-    return User.query.get(user_id)
-
 @classes_bp.route('', methods=['GET'])
 def get_classes():
     try:
@@ -17,9 +21,77 @@ def get_classes():
         if not user:
             return jsonify({'error': 'Não autenticado'}), 401
         
-        classes = Class.query.filter_by(is_active=True).all()
-        return jsonify([cls.to_dict() for cls in classes]), 200
+        # student_count depende dos estudantes, então as duas versões entram na ETag
+        stamp = CollectionStamp('classes', 'students')
+        if stamp.is_fresh():
+            return stamp.not_modified()
+        
+        page = Page.from_request(Class)
+        return stamp.apply(page.response(Class.is_active == True)), 200
+        
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@classes_bp.route('/<int:class_id>/sheet', methods=['GET'])
+def get_attendance_sheet(class_id):
+    try:
+        user = require_auth()
+        if not user:
+            return jsonify({'error': 'Não autenticado'}), 401
         
+        if not request.args.get('date'):
+            return jsonify({'error': 'date é obrigatório'}), 400
+        sheet_date = datetime.strptime(request.args.get('date'), '%Y-%m-%d').date()
+        
+        # Roster ativo da turma com a frequência do dia em um único LEFT JOIN
+        columns = [
+            Student.id.label('id'),
+            Student.student_id.label('student_id'),
+            Student.name.label('name'),
+            Attendance.id.label('attendance_id'),
+            Attendance.status.label('status'),
+            Attendance.notes.label('notes')
+        ]
+        roster_criteria = (Student.class_id == class_id, Student.is_active == True)
+        archives = archive_engines(sheet_date, sheet_date)
+        if archives:
+            # Ano arquivado: o roster vem da base principal e as frequências
+            # do dia, do arquivo do ano
+            roster = db.session.connection().execute(
+                select(*columns[:3]).where(*roster_criteria).order_by(Student.name, Student.id)
+            ).all()
+            with archives[0].connect() as connection:
+                recorded = {
+                    row.student_id: (row.id, row.status, row.notes)
+                    for row in connection.execute(
+                        select(Attendance.student_id, Attendance.id, Attendance.status, Attendance.notes).where(
+                            Attendance.date == sheet_date,
+                            Attendance.student_id.in_([row.id for row in roster])
+                        )
+                    )
+                }
+            rows = [(*row, *recorded.get(row.id, (None, None, None))) for row in roster]
+        else:
+            statement = select(*columns).outerjoin(
+                Attendance,
+                and_(Attendance.student_id == Student.id, Attendance.date == sheet_date)
+            ).where(*roster_criteria).order_by(Student.name, Student.id)
+            rows = db.session.connection().execute(statement).all()
+        
+        if not rows and not db.session.get(Class, class_id):
+            return jsonify({'error': 'Turma não encontrada'}), 404
+        
+        encode = row_encoder(columns)
+        return json_response({
+            'class_id': class_id,
+            'date': sheet_date.isoformat(),
+            'students': [encode(row) for row in rows]
+        })
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -42,6 +114,7 @@ def create_class():
         )
         
         db.session.add(new_class)
+        CollectionVersion.bump('classes')
         db.session.commit()
         
         return jsonify(new_class.to_dict()), 201
@@ -66,6 +139,7 @@ def update_class(class_id):
         cls.teacher = data.get('teacher', cls.teacher)
         cls.description = data.get('description', cls.description)
         
+        CollectionVersion.bump('classes')
         db.session.commit()
         
         return jsonify(cls.to_dict()), 200
@@ -84,6 +158,7 @@ def delete_class(class_id):
         cls = Class.query.get_or_404(class_id)
         cls.is_active = False  # Soft delete
         
+        CollectionVersion.bump('classes')
         db.session.commit()
         
         return jsonify({'message': 'Turma excluída com sucesso'}), 200
@@ -0,0 +1,77 @@
+import os
+
+from flask import Blueprint, request, jsonify, send_file
+from src.models.user import db
+from src.models.job import Job
+from src.authentication import require_auth
+from src.jobs import JOB_TYPES, enqueue_job
+
+jobs_bp = Blueprint('jobs', __name__)
+
+def get_visible_job(job_id, user):
+    job = db.session.get(Job, job_id)
+    if not job or (job.created_by != user.id and user.role != 'admin'):
+        return None
+    return job
+
+@jobs_bp.route('', methods=['POST'])
+def create_job():
+    try:
+        user = require_auth()
+        if not user:
+            return jsonify({'error': 'Não autenticado'}), 401
+        
+        data = request.get_json() or {}
+        job_type = data.get('type')
+        
+        if job_type not in JOB_TYPES:
+            return jsonify({'error': f'Tipo de tarefa inválido. Tipos disponíveis: {", ".join(sorted(JOB_TYPES))}'}), 400
+        if JOB_TYPES[job_type][1] and user.role != 'admin':
+            return jsonify({'error': 'Acesso negado'}), 403
+        
+        job = enqueue_job(job_type, data.get('params'), user)
+        
+        return jsonify(job.to_dict()), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    try:
+        user = require_auth()
+        if not user:
+            return jsonify({'error': 'Não autenticado'}), 401
+        
+        job = get_visible_job(job_id, user)
+        if not job:
+            return jsonify({'error': 'Tarefa não encontrada'}), 404
+        
+        return jsonify(job.to_dict()), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@jobs_bp.route('/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    try:
+        user = require_auth()
+        if not user:
+            return jsonify({'error': 'Não autenticado'}), 401
+        
+        job = get_visible_job(job_id, user)
+        if not job:
+            return jsonify({'error': 'Tarefa não encontrada'}), 404
+        if job.status != 'succeeded' or not job.result_path or not os.path.exists(job.result_path):
+            return jsonify({'error': 'Resultado não disponível'}), 409
+        
+        return send_file(
+            job.result_path,
+            mimetype=job.result_mimetype,
+            as_attachment=True,
+            download_name=f'{job.type}-{job.id}{os.path.splitext(job.result_path)[1]}'
+        )
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,16 +1,17 @@
-from flask import Blueprint, request, jsonify, session
-from src.models.user import User, db
+from flask import Blueprint, current_app, request, jsonify
+from src.models.user import db
+from src.authentication import require_auth
 from src.models.student import Student
+from src.models.collection_version import CollectionVersion
+from src.pagination import Page, PaginationError
+from src.http_cache import CollectionStamp
+from src.imports import StudentImportError, import_students, save_upload, text_stream
+from src.jobs import enqueue_job
+from src.search import SearchError, search_students
 from datetime import datetime
 
 students_bp = Blueprint('students', __name__)
 
-def require_auth():
-    user_id = session.get('user_id')
-    if not user_id:
-        return None
-    return User.query.get(user_id)
-
 @students_bp.route('', methods=['GET'])
 def get_students():
     try:
@@ -18,9 +19,29 @@ def get_students():
         if not user:
             return jsonify({'error': 'Não autenticado'}), 401
         
-        students = Student.query.filter_by(is_active=True).all()
-        return jsonify([student.to_dict() for student in students]), 200
+        stamp = CollectionStamp('students')
+        if stamp.is_fresh():
+            return stamp.not_modified()
+        
+        page = Page.from_request(Student)
+        return stamp.apply(page.response(Student.is_active == True)), 200
+        
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@students_bp.route('/search', methods=['GET'])
+def search():
+    try:
+        user = require_auth()
+        if not user:
+            return jsonify({'error': 'Não autenticado'}), 401
+        
+        return search_students(), 200
         
+    except SearchError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -55,6 +76,7 @@ def create_student():
         )
         
         db.session.add(new_student)
+        CollectionVersion.bump('students')
         db.session.commit()
         
         return jsonify(new_student.to_dict()), 201
@@ -63,6 +85,36 @@ def create_student():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@students_bp.route('/import', methods=['POST'])
+def import_students_csv():
+    try:
+        user = require_auth()
+        if not user or user.role != 'admin':
+            return jsonify({'error': 'Acesso negado'}), 403
+        
+        # Aceita um formulário multipart com o campo "file" ou o CSV como corpo
+        # da requisição (Content-Type: text/csv), lido em fluxo
+        if request.mimetype == 'multipart/form-data':
+            if 'file' not in request.files:
+                return jsonify({'error': 'Arquivo CSV não enviado'}), 400
+            upload = request.files['file'].stream
+        else:
+            upload = request.stream
+        
+        if request.args.get('async') in ('1', 'true'):
+            job = enqueue_job('student_import', {'upload': save_upload(upload, current_app.config)}, user)
+            return jsonify(job.to_dict()), 202
+        
+        report = import_students(text_stream(upload), current_app.config)
+        return jsonify(report), 200
+        
+    except (StudentImportError, UnicodeDecodeError) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @students_bp.route('/<int:student_id>', methods=['PUT'])
 def update_student(student_id):
     try:
@@ -84,6 +136,7 @@ def update_student(student_id):
         if data.get('birth_date'):
             student.birth_date = datetime.strptime(data.get('birth_date'), '%Y-%m-%d').date()
         
+        CollectionVersion.bump('students')
         db.session.commit()
         
         return jsonify(student.to_dict()), 200
@@ -102,6 +155,7 @@ def delete_student(student_id):
         student = Student.query.get_or_404(student_id)
         student.is_active = False  # Soft delete
         
+        CollectionVersion.bump('students')
         db.session.commit()
         
         return jsonify({'message': 'Estudante excluído com sucesso'}), 200
@@ -1,20 +1,11 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify
 from src.models.user import User, db
+from src.authentication import require_admin, user_cache
+from src.pagination import Page, PaginationError
+from src.models.collection_version import CollectionVersion
 
 user_bp = Blueprint('users', __name__)
 
-def require_auth():
-    user_id = session.get('user_id')
-    if not user_id:
-        return None
-    return User.query.get(user_id)
-
-def require_admin():
-    user = require_auth()
-    if not user or user.role != 'admin':
-        return None
-    return user
-
 @user_bp.route('', methods=['GET'])
 def get_users():
     try:
@@ -22,9 +13,11 @@ def get_users():
         if not user:
             return jsonify({'error': 'Acesso negado'}), 403
         
-        users = User.query.all()
-        return jsonify([user.to_dict() for user in users]), 200
+        page = Page.from_request(User, hidden=('password_hash',))
+        return page.response(), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -51,6 +44,7 @@ def create_user():
         new_user.set_password(data.get('password'))
         
         db.session.add(new_user)
+        CollectionVersion.bump('users')
         db.session.commit()
         
         return jsonify(new_user.to_dict()), 201
@@ -78,7 +72,9 @@ def update_user(user_id):
         if data.get('password'):
             user.set_password(data.get('password'))
         
+        CollectionVersion.bump('users')
         db.session.commit()
+        user_cache().invalidate(user.id)
         
         return jsonify(user.to_dict()), 200
         
@@ -98,7 +94,9 @@ def delete_user(user_id):
         
         user = User.query.get_or_404(user_id)
         db.session.delete(user)
+        CollectionVersion.bump('users')
         db.session.commit()
+        user_cache().invalidate(user_id)
         
         return jsonify({'message': 'Usuário excluído com sucesso'}), 200
         
@@ -0,0 +1,128 @@
+import re
+from urllib.parse import urlencode
+
+from flask import current_app, request
+from sqlalchemy import column, func, inspect, literal_column, or_, select, table, text
+from src.models.user import db
+from src.models.student import Student
+from src.serialization import json_response, row_encoder
+
+# Índice FTS5 de conteúdo externo: guarda só os tokens e lê as colunas da
+# tabela students. unicode61 com remove_diacritics 2 ignora acentos e
+# maiúsculas ("joão" encontra "João"); prefix='2 3' mantém índices de
+# prefixo para que buscas curtas como "ma*" não varram todos os termos
+SEARCH_TABLE = 'students_fts'
+SEARCH_COLUMNS = ('name', 'student_id', 'email', 'parent_name')
+# Pesos do bm25 na ordem de SEARCH_COLUMNS: o nome conta mais que o e-mail
+SEARCH_WEIGHTS = (10.0, 5.0, 1.0, 2.0)
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+SEARCH_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        {', '.join(SEARCH_COLUMNS)},
+        content='students', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    # Gatilhos mantêm o índice sincronizado com qualquer escrita em students,
+    # inclusive inserções em lote feitas pelo Core ou direto no SQLite
+    f"""CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES (new.id, {', '.join('new.' + name for name in SEARCH_COLUMNS)});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.id, {', '.join('old.' + name for name in SEARCH_COLUMNS)});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE OF {', '.join(SEARCH_COLUMNS)} ON students BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.id, {', '.join('old.' + name for name in SEARCH_COLUMNS)});
+        INSERT INTO {SEARCH_TABLE}(rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES (new.id, {', '.join('new.' + name for name in SEARCH_COLUMNS)});
+    END"""
+)
+
+search_index = table(SEARCH_TABLE, column('rowid'))
+
+
+class SearchError(ValueError):
+    pass
+
+
+def create_search_index(connection):
+    # Chamado por upgrade_database(); em bancos existentes o índice é
+    # preenchido uma única vez a partir da tabela students
+    if connection.dialect.name != 'sqlite':
+        return
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': SEARCH_TABLE}
+    ).first()
+    for statement in SEARCH_DDL:
+        connection.execute(text(statement))
+    if not exists:
+        connection.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"))
+
+
+def search_terms(query):
+    # Palavras do usuário; aspas e operadores do FTS5 não são repassados
+    return [term for term in re.split(r'[\s"*():^+-]+', query) if term]
+
+
+def match_expression(terms):
+    # Cada palavra vira um prefixo entre aspas ("mar"* AND "sil"*)
+    return ' AND '.join(f'"{term}"*' for term in terms)
+
+
+def search_columns():
+    attributes = inspect(Student).column_attrs
+    return [attributes[name].expression.label(name) for name in attributes.keys()]
+
+
+def search_statement(terms, limit, offset):
+    columns = search_columns()
+    if db.session.get_bind().dialect.name == 'sqlite':
+        fts = literal_column(SEARCH_TABLE)
+        statement = select(*columns).select_from(
+            search_index.join(Student.__table__, Student.__table__.c.id == search_index.c.rowid)
+        ).where(
+            fts.op('MATCH')(match_expression(terms))
+        ).order_by(func.bm25(fts, *SEARCH_WEIGHTS), Student.id)
+    else:
+        # Outros bancos: LIKE sem índice (sem ranking nem remoção de acentos)
+        searchable = [getattr(Student, name) for name in SEARCH_COLUMNS]
+        statement = select(*columns).where(*[
+            or_(*[attribute.ilike(f'%{term}%') for attribute in searchable]) for term in terms
+        ]).order_by(Student.name, Student.id)
+    return columns, statement.where(Student.is_active == True).limit(limit + 1).offset(offset)
+
+
+def search_students():
+    terms = search_terms(request.args.get('q', ''))
+    if not terms:
+        raise SearchError('Informe o termo de busca (q)')
+
+    max_limit = current_app.config.get('SEARCH_MAX_LIMIT', SEARCH_MAX_LIMIT)
+    try:
+        limit = int(request.args.get('limit', current_app.config.get('SEARCH_DEFAULT_LIMIT', SEARCH_DEFAULT_LIMIT)))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        raise SearchError('limit e offset devem ser números inteiros')
+    if limit < 1 or limit > max_limit:
+        raise SearchError(f'limit deve estar entre 1 e {max_limit}')
+    if offset < 0:
+        raise SearchError('offset não pode ser negativo')
+
+    columns, statement = search_statement(terms, limit, offset)
+    rows = db.session.connection().execute(statement).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    encode = row_encoder(columns)
+    response = json_response([encode(row) for row in rows])
+    if has_more:
+        args = request.args.to_dict()
+        args.update(offset=offset + limit, limit=limit)
+        response.headers['X-Next-Offset'] = str(offset + limit)
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
@@ -0,0 +1,47 @@
+import json
+
+from flask import Response
+from sqlalchemy import Date, DateTime
+
+# orjson é opcional: quando instalado, codifica datas nativamente e é bem
+# mais rápido que o json da biblioteca padrão
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def row_encoder(columns):
+    # Monta, uma única vez por consulta, a função que transforma as tuplas de
+    # colunas em dicionários; só as colunas de data passam por isoformat()
+    names = [column.key for column in columns]
+    dates = [] if orjson else [
+        index for index, column in enumerate(columns) if isinstance(column.type, (Date, DateTime))
+    ]
+    if not dates:
+        return lambda row: dict(zip(names, row))
+
+    def encode(row):
+        values = list(row)
+        for index in dates:
+            if values[index] is not None:
+                values[index] = values[index].isoformat()
+        return dict(zip(names, values))
+
+    return encode
+
+
+def serialize_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def dumps(data):
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=serialize_value)
+
+
+def json_response(data, status=200):
+    return Response(dumps(data), status=status, mimetype='application/json')
@@ -0,0 +1,186 @@
+import gzip
+import mimetypes
+import os
+import re
+import threading
+from datetime import datetime, timezone
+
+from flask import Response, current_app, request
+from werkzeug.exceptions import NotFound
+
+# brotli é opcional: sem ele os arquivos são servidos apenas com gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Configuração:
+#   STATIC_COMPRESS_MIN_SIZE  arquivos menores não são comprimidos
+#   STATIC_IMMUTABLE_MAX_AGE  validade (s) dos arquivos com hash no nome
+STATIC_COMPRESS_MIN_SIZE = 1024
+STATIC_IMMUTABLE_MAX_AGE = 31536000
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml', 'application/wasm')
+# Extensão do arquivo pré-comprimido de cada codificação, em ordem de preferência
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+# Nomes gerados pelo vite build (assets/[name]-[hash].[ext], hash de 8
+# caracteres): assets/index-4f2a9c1b.js. Arquivos de public/ são copiados para
+# a raiz sem hash e nunca são imutáveis (android-chrome-192x192.png)
+HASHED_NAME = re.compile(r'^assets/(?:.+/)?[^/]+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$')
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def available_encodings():
+    return [(encoding, extension) for encoding, extension in ENCODINGS if encoding != 'br' or brotli]
+
+
+class StaticAsset:
+    def __init__(self, path, size, mtime, immutable):
+        self.path = path
+        self.size = size
+        self.last_modified = datetime.fromtimestamp(int(mtime), timezone.utc)
+        self.etag = f'{size:x}-{int(mtime):x}'
+        mimetype, file_encoding = mimetypes.guess_type(path)
+        if file_encoding:
+            # Arquivo já comprimido (x.csv.gz) é servido como está, não como x.csv
+            mimetype = 'application/gzip' if file_encoding == 'gzip' else None
+        self.mimetype = mimetype or 'application/octet-stream'
+        self.immutable = immutable
+        self.compressible = self.mimetype.startswith(COMPRESSIBLE_TYPES)
+        # Variantes pré-comprimidas gravadas ao lado do arquivo (compress-static)
+        self.precompressed = {}
+        # Conteúdo lido no primeiro acesso: codificação ('identity', 'gzip', 'br') -> bytes
+        self._content = {}
+        self._lock = threading.Lock()
+
+    def content(self, encoding):
+        data = self._content.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._content.get(encoding)
+                if data is None:
+                    data = self._content[encoding] = self._load(encoding)
+        return data
+
+    def _load(self, encoding):
+        if encoding in self.precompressed:
+            with open(self.precompressed[encoding], 'rb') as source:
+                return source.read()
+        original = self._content.get('identity')
+        if original is None:
+            with open(self.path, 'rb') as source:
+                original = self._content['identity'] = source.read()
+        # Sem variante gravada em disco: comprime no primeiro acesso
+        return original if encoding == 'identity' else compress(original, encoding)
+
+
+class StaticIndex:
+    # Índice em memória dos arquivos do frontend, montado uma única vez: as
+    # requisições não consultam o sistema de arquivos para saber se um
+    # caminho existe, e o conteúdo (original e comprimido) fica em memória
+    def __init__(self, root, min_size=STATIC_COMPRESS_MIN_SIZE, max_age=STATIC_IMMUTABLE_MAX_AGE):
+        self.root = root
+        self.min_size = min_size
+        self.max_age = max_age
+        self.assets = {}
+        if not os.path.isdir(root):
+            return
+
+        files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                files[os.path.relpath(path, root).replace(os.sep, '/')] = (path, os.stat(path))
+
+        # x.gz/x.br só é variante pré-comprimida quando x também existe; sem
+        # o original é um arquivo comum (ex. um .gz para download)
+        variants = []
+        for key, (path, stat) in files.items():
+            source = next((key[:-len(extension)] for _, extension in ENCODINGS if key.endswith(extension)), None)
+            if source in files:
+                variants.append((key, source, path, stat))
+                continue
+            self.assets[key] = StaticAsset(path, stat.st_size, stat.st_mtime, bool(HASHED_NAME.match(key)))
+
+        for key, source, path, stat in variants:
+            asset = self.assets[source]
+            if stat.st_mtime < files[source][1].st_mtime:
+                # Gravada antes do arquivo atual (deploy sem compress-static):
+                # ignorada, o original é comprimido no primeiro acesso
+                continue
+            for encoding, extension in ENCODINGS:
+                if key.endswith(extension):
+                    asset.precompressed[encoding] = path
+
+    def get(self, path):
+        return self.assets.get(path)
+
+    def negotiate(self, asset):
+        if not asset.compressible or asset.size < self.min_size:
+            return 'identity'
+        for encoding, _ in ENCODINGS:
+            available = encoding in asset.precompressed or encoding != 'br' or brotli
+            if available and request.accept_encodings[encoding]:
+                return encoding
+        return 'identity'
+
+    def response(self, asset):
+        encoding = self.negotiate(asset)
+        response = Response(asset.content(encoding), mimetype=asset.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        if asset.compressible:
+            response.vary.add('Accept-Encoding')
+        response.set_etag(asset.etag if encoding == 'identity' else f'{asset.etag}-{encoding}')
+        response.last_modified = asset.last_modified
+        if asset.immutable:
+            response.headers['Cache-Control'] = f'public, max-age={self.max_age}, immutable'
+        else:
+            # index.html precisa ser revalidado para apontar para os bundles novos
+            response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+
+_index_lock = threading.Lock()
+
+
+def static_index():
+    # Montado no primeiro acesso ao frontend; novos arquivos exigem reiniciar
+    with _index_lock:
+        if 'static_index' not in current_app.extensions:
+            current_app.extensions['static_index'] = StaticIndex(
+                current_app.static_folder,
+                current_app.config.get('STATIC_COMPRESS_MIN_SIZE', STATIC_COMPRESS_MIN_SIZE),
+                current_app.config.get('STATIC_IMMUTABLE_MAX_AGE', STATIC_IMMUTABLE_MAX_AGE)
+            )
+        return current_app.extensions['static_index']
+
+
+def serve_static(path):
+    index = static_index()
+    # Rotas do SPA que não são arquivos recebem o index.html
+    asset = index.get(path) if path else None
+    if asset is None:
+        asset = index.get('index.html')
+    if asset is None:
+        raise NotFound()
+    return index.response(asset)
+
+
+def precompress_static(root, min_size=STATIC_COMPRESS_MIN_SIZE):
+    # Grava .gz (e .br, com brotli instalado) ao lado dos arquivos do build
+    written = 0
+    for asset in StaticIndex(root).assets.values():
+        if not asset.compressible or asset.size < min_size:
+            continue
+        with open(asset.path, 'rb') as source:
+            data = source.read()
+        for encoding, extension in available_encodings():
+            with open(asset.path + extension, 'wb') as output:
+                output.write(compress(data, encoding))
+            written += 1
+    return written
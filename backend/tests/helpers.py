@@ -0,0 +1,46 @@
+from sqlalchemy import event
+from src.models.user import db
+from src.models.class_model import Class
+from src.models.student import Student
+
+
+def seed_classes(app, classes, students_per_class):
+    # Turmas 'Turma <i>' com estudantes 'Aluno <turma>-<n>'; devolve os ids das turmas
+    with app.app_context():
+        rows = [Class(name=f'Turma {i}', grade='5º Ano', year=2024, teacher='Professor', school_id=1) for i in range(classes)]
+        db.session.add_all(rows)
+        db.session.commit()
+        class_ids = [cls.id for cls in rows]
+        students = [
+            {
+                'student_id': f'{class_id}-{n:03d}',
+                'name': f'Aluno {class_id}-{n:03d}',
+                'email': f'aluno{class_id}-{n:03d}@escola.com.br',
+                'class_id': class_id,
+                'is_active': True
+            }
+            for class_id in class_ids
+            for n in range(students_per_class)
+        ]
+        if students:
+            db.session.execute(Student.__table__.insert(), students)
+            db.session.commit()
+        return class_ids
+
+
+class StatementCounter:
+    # Conta os comandos SQL emitidos pelo engine da aplicação enquanto ativo
+    def __init__(self, app):
+        with app.app_context():
+            self.engine = db.engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._count)
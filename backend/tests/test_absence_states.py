@@ -0,0 +1,67 @@
+import random
+from datetime import date, timedelta
+
+from src.models.absence_state import verify_absence_states
+from src.models.attendance_summary import ClassDailySummary, StudentMonthlySummary, rebuild_summaries
+from src.models.student import Student
+from src.partitions import current_school_year
+from tests.helpers import seed_classes
+
+STATUSES = ('present', 'absent', 'late')
+
+
+def summary_rows():
+    return (
+        sorted(tuple(summary.to_dict().items()) for summary in ClassDailySummary.query),
+        sorted(tuple(summary.to_dict().items()) for summary in StudentMonthlySummary.query)
+    )
+
+
+def test_mixed_writes_across_term_boundary_keep_states_and_summaries_exact(app, client):
+    class_id, = seed_classes(app, 1, 6)
+    with app.app_context():
+        roster = [row.id for row in Student.query.with_entities(Student.id).filter_by(class_id=class_id).order_by(Student.id)]
+
+    # Dias úteis de 10/06 a 20/07 do ano corrente: cruzam a virada do semestre
+    year = current_school_year()
+    days = [date(year, 6, 10) + timedelta(days=offset) for offset in range(41)]
+    days = [day for day in days if day.weekday() < 5]
+    rng = random.Random(24)
+    recorded = {}
+    for _ in range(300):
+        day = rng.choice(days)
+        action = rng.random()
+        if action < 0.3:
+            response = client.post('/api/attendance/batch', json={
+                'class_id': class_id,
+                'date': day.isoformat(),
+                'records': [
+                    {'student_id': student_id, 'status': rng.choice(STATUSES)}
+                    for student_id in rng.sample(roster, rng.randint(1, len(roster)))
+                ]
+            })
+            assert response.status_code == 200
+            for result in response.get_json()['results']:
+                recorded[(result['student_id'], day)] = result['attendance']['id']
+        elif action < 0.55:
+            student_id = rng.choice(roster)
+            response = client.post('/api/attendance', json={
+                'student_id': student_id, 'class_id': class_id, 'date': day.isoformat(), 'status': rng.choice(STATUSES)
+            })
+            assert response.status_code in (201, 400)
+            if response.status_code == 201:
+                recorded[(student_id, day)] = response.get_json()['id']
+        elif recorded and action < 0.8:
+            attendance_id = recorded[rng.choice(sorted(recorded))]
+            response = client.put(f'/api/attendance/{attendance_id}', json={'status': rng.choice(STATUSES)})
+            assert response.status_code == 200
+        elif recorded:
+            key = rng.choice(sorted(recorded))
+            response = client.delete(f'/api/attendance/{recorded.pop(key)}')
+            assert response.status_code == 200
+
+    with app.app_context():
+        assert verify_absence_states() == []
+        incremental = summary_rows()
+        rebuild_summaries()
+        assert summary_rows() == incremental
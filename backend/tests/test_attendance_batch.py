@@ -0,0 +1,41 @@
+from src.models.student import Student
+from tests.helpers import seed_classes
+
+
+def test_batch_rejects_malformed_input_with_400_or_row_errors(app, client):
+    class_id, = seed_classes(app, 1, 2)
+    with app.app_context():
+        roster = [row.id for row in Student.query.with_entities(Student.id).filter_by(class_id=class_id).order_by(Student.id)]
+
+    for class_value in ('abc', [class_id], {'id': class_id}, 1.5):
+        response = client.post('/api/attendance/batch', json={
+            'class_id': class_value, 'date': '2024-03-01', 'records': [{'student_id': roster[0], 'status': 'present'}]
+        })
+        assert response.status_code == 400
+    assert client.post('/api/attendance/batch', json=[class_id]).status_code == 400
+    for records in ({'student_id': roster[0]}, 'abc', 5):
+        response = client.post('/api/attendance/batch', json={'class_id': class_id, 'date': '2024-03-01', 'records': records})
+        assert response.status_code == 400
+    response = client.post('/api/attendance/batch', json={
+        'class_id': class_id, 'date': '01/03/2024', 'records': [{'student_id': roster[0], 'status': 'present'}]
+    })
+    assert response.status_code == 400
+
+    response = client.post('/api/attendance/batch', json={
+        'class_id': str(class_id),
+        'date': '2024-03-01',
+        'records': [
+            'abc',
+            None,
+            {'student_id': [roster[0]], 'status': 'present'},
+            {'student_id': {'id': roster[0]}, 'status': 'present'},
+            {'student_id': True, 'status': 'present'},
+            {'student_id': str(roster[0]), 'status': 'present'},
+            {'student_id': roster[1], 'status': 'absent'}
+        ]
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['created'] == 2 and body['errors'] == 5
+    assert [result['error'] for result in body['results'][:5]] == ['Registro inválido'] * 2 + ['student_id inválido'] * 3
+    assert [result['student_id'] for result in body['results'][5:]] == roster
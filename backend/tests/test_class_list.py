@@ -0,0 +1,19 @@
+from tests.helpers import StatementCounter, seed_classes
+
+
+def list_classes(app, client, classes):
+    seed_classes(app, classes, 3)
+    with StatementCounter(app) as counter:
+        response = client.get('/api/classes')
+    assert response.status_code == 200
+    return counter.count, response.get_json()
+
+
+def test_class_list_statements_do_not_grow_with_classes(app, client):
+    statements, listed = list_classes(app, client, 5)
+    assert len(listed) == 5
+    assert all(cls['student_count'] == 3 for cls in listed)
+
+    with_more, listed = list_classes(app, client, 45)
+    assert len(listed) == 50
+    assert with_more == statements
@@ -0,0 +1,59 @@
+from src.models.student import Student
+from src.models.user import db
+from tests.helpers import seed_classes
+
+
+def test_sheet_of_500_students_lists_roster_with_day_status(app, client):
+    class_id, other_class_id = seed_classes(app, 2, 500)
+    with app.app_context():
+        other_roster = [row.id for row in Student.query.with_entities(Student.id).filter_by(class_id=other_class_id)]
+        roster = [row.id for row in Student.query.with_entities(Student.id).filter_by(class_id=class_id).order_by(Student.name)]
+        inactive = db.session.get(Student, roster[-1])
+        inactive.is_active = False
+        db.session.commit()
+    recorded = roster[:-1:2]
+    response = client.post('/api/attendance/batch', json={
+        'class_id': class_id,
+        'date': '2024-03-01',
+        'records': [
+            {'student_id': student_id, 'status': 'absent' if index % 3 == 0 else 'present', 'notes': f'nota {student_id}'}
+            for index, student_id in enumerate(recorded)
+        ]
+    })
+    assert response.status_code == 200 and response.get_json()['errors'] == 0
+    # Outro dia e outra turma não entram na folha
+    client.post('/api/attendance/batch', json={
+        'class_id': class_id,
+        'date': '2024-03-02',
+        'records': [{'student_id': student_id, 'status': 'late'} for student_id in roster]
+    })
+    client.post('/api/attendance/batch', json={
+        'class_id': other_class_id,
+        'date': '2024-03-01',
+        'records': [{'student_id': student_id, 'status': 'absent'} for student_id in other_roster]
+    })
+
+    response = client.get(f'/api/classes/{class_id}/sheet?date=2024-03-01')
+    assert response.status_code == 200
+    sheet = response.get_json()
+    assert sheet['class_id'] == class_id
+    assert sheet['date'] == '2024-03-01'
+
+    students = sheet['students']
+    assert len(students) == 499
+    assert [student['id'] for student in students] == roster[:-1]
+    assert [student['name'] for student in students] == sorted(student['name'] for student in students)
+    expected = {student_id: 'absent' if index % 3 == 0 else 'present' for index, student_id in enumerate(recorded)}
+    for student in students:
+        assert set(student) == {'id', 'student_id', 'name', 'attendance_id', 'status', 'notes'}
+        assert student['status'] == expected.get(student['id'])
+        if student['id'] in expected:
+            assert student['attendance_id'] is not None
+            assert student['notes'] == f'nota {student["id"]}'
+        else:
+            assert student['attendance_id'] is None and student['notes'] is None
+
+
+def test_sheet_requires_date_and_existing_class(app, client):
+    assert client.get('/api/classes/1/sheet').status_code == 400
+    assert client.get('/api/classes/999/sheet?date=2024-03-01').status_code == 404
@@ -0,0 +1,54 @@
+from tests.helpers import StatementCounter, seed_classes
+
+
+def test_matching_etag_returns_304_until_a_write(app, client):
+    seed_classes(app, 3, 4)
+    for url in ('/api/classes', '/api/students'):
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+
+        with StatementCounter(app) as counter:
+            cached = client.get(url, headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b''
+        assert cached.headers['ETag'] == etag
+        # Só as leituras de versões (usuários, na autenticação, e as coleções
+        # da listagem), sem consultar os registros
+        assert counter.count == 2
+
+    etags = {url: client.get(url).headers['ETag'] for url in ('/api/classes', '/api/students')}
+    assert client.put('/api/students/1', json={'name': 'Aluno Renomeado'}).status_code == 200
+
+    # Estudantes entram na ETag das turmas (student_count)
+    for url, etag in etags.items():
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+    names = [student['name'] for student in client.get('/api/students').get_json()]
+    assert 'Aluno Renomeado' in names
+
+
+def test_etag_depends_on_query_string(app, client):
+    seed_classes(app, 1, 5)
+    etag = client.get('/api/students?limit=2').headers['ETag']
+    assert client.get('/api/students?limit=3', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_etag_matches_negotiated_encoding(app, client):
+    seed_classes(app, 2, 40)
+    gzip = {'Accept-Encoding': 'gzip'}
+    compressed = client.get('/api/students', headers=gzip)
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    etag = compressed.headers['ETag']
+    assert etag.endswith('-gzip"')
+
+    cached = client.get('/api/students', headers=dict(gzip, **{'If-None-Match': etag}))
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == etag
+
+    # Sem gzip o validador da variante comprimida não vale
+    identity = client.get('/api/students', headers={'If-None-Match': etag})
+    assert identity.status_code == 200
+    assert 'Content-Encoding' not in identity.headers
+    assert client.get('/api/students', headers={'If-None-Match': identity.headers['ETag']}).status_code == 304